@@ -9,28 +9,71 @@ def create_app():
     app = Flask(__name__)
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
     
+    # Compiled templates survive restarts and are shared by all workers
+    from jinja2 import FileSystemBytecodeCache
+    jinja_cache_dir = os.getenv('JINJA_CACHE_DIR', os.path.join('data', 'jinja_cache'))
+    os.makedirs(jinja_cache_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(jinja_cache_dir)
+    
+    # {% cache %} blocks for fragments that only depend on language and config
+    from app.services.fragment_cache import FragmentCacheExtension
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    
     # Initialize database
-    from app.database import init_database
+    from app.database import init_database, close_request_session
     with app.app_context():
         init_database()
     
+    # One session per request, shared by all service calls
+    app.teardown_appcontext(close_request_session)
+    
+    # Server-Timing header and /metrics: latency, queries, templates, caches
+    from app.database import engine
+    from app.services.metrics import MetricsService
+    MetricsService.init_app(app, engine)
+    
     # Generate QR codes on startup
     from app.services.qr import QRService
     site_url = os.getenv('SITE_URL', 'http://localhost:5000')
     QRService.save_qr_files(site_url)
     
-    # Setup i18n
+    # Setup i18n (catalogs are compiled and loaded per language on first use)
     from app.services.i18n import t, I18nService
     
-    # Force load translations on startup
-    I18nService.load_translations()
-    
     app.jinja_env.globals.update(t=t)
     app.jinja_env.globals.update(get_current_language=I18nService.get_current_language)
     app.jinja_env.globals.update(SUPPORTED_LANGUAGES=I18nService.SUPPORTED_LANGUAGES)
     
+    # Per request: resolve the language once and inject a t() bound to it
+    app.context_processor(I18nService.template_context)
+    
+    # Compress HTML/SVG/JSON responses, reusing stored variants where possible
+    from app.services.compression import CompressionService
+    app.after_request(CompressionService.compress_response)
+    
     # Register blueprints
     from app.routes_public import public_bp
     app.register_blueprint(public_bp)
     
+    from app.routes_api import api_bp
+    app.register_blueprint(api_bp)
+    
+    # Expired statuses are computed on read; this persists them (e.g. via cron)
+    from app.services.status import StatusService
+    
+    @app.cli.command('expire-status')
+    def expire_status_command():
+        """Persist the switch back to ANWESEND after a status expired"""
+        status = StatusService.expire_stale_status()
+        print(f"Status reset to {status.type.value}" if status else "Status still valid")
+    
+    # After writes that bypass the app (e.g. SQL by hand) or a config change
+    from app.services.snapshot import SnapshotService
+    
+    @app.cli.command('publish-snapshot')
+    def publish_snapshot_command():
+        """Rewrite the snapshot shared by the workers"""
+        print(f"Snapshot written to {SnapshotService.PATH}" if SnapshotService.publish()
+              else "Snapshot disabled or not writable")
+    
     return app
\ No newline at end of file
@@ -0,0 +1,259 @@
+"""ASGI serving mode for bursts of QR scans
+
+The event loop holds the connections; the Flask app (same templates, same
+services) runs in a bounded thread pool, so slow or idle clients no longer
+occupy a worker thread. QR codes that are not cached yet are rendered in a
+separate executor before the request reaches Flask, and concurrent scans of
+the same code share one render.
+
+Needs an ASGI server, e.g. ``pip install uvicorn``::
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+from app.services.qr import QRService
+import asyncio
+import os
+import sys
+import threading
+
+# Threads running the Flask app; keep DB_POOL_SIZE + DB_MAX_OVERFLOW at least as large
+THREADS = int(os.getenv('ASGI_THREADS', '32'))
+
+# Threads rendering QR codes that are not cached yet
+QR_WORKERS = int(os.getenv('ASGI_QR_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+QR_PATHS = {'/qr': 'png', '/qr.svg': 'svg'}
+
+# Request bodies larger than this are spooled to disk
+MAX_MEMORY_BODY = 64 * 1024
+
+
+class AsyncPortal:
+    """ASGI application wrapping the Flask WSGI app"""
+    
+    def __init__(self, wsgi_app, threads: int = THREADS, qr_workers: int = QR_WORKERS):
+        self.wsgi_app = wsgi_app
+        self.threads = threads
+        self.qr_workers = qr_workers
+        self.executor = None
+        self.qr_executor = None
+        # (target, format) -> render in progress
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+    
+    def _start(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.threads, thread_name_prefix='portal')
+            self.qr_executor = ThreadPoolExecutor(self.qr_workers, thread_name_prefix='portal-qr')
+    
+    def _stop(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.qr_executor.shutdown(wait=True)
+            self.executor = self.qr_executor = None
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"unsupported ASGI scope type {scope['type']!r}")
+    
+    async def _lifespan(self, receive, send):
+        """Size the executors at startup and drain them at shutdown"""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self._start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self._stop()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    async def _http(self, scope, receive, send):
+        # Servers without lifespan support
+        self._start()
+        
+        if scope['method'] in ('GET', 'HEAD') and scope['path'] in QR_PATHS:
+            await self._prerender_qr(scope)
+        
+        body = await self._read_body(receive)
+        if body is None:
+            return
+        
+        loop = asyncio.get_running_loop()
+        disconnected = threading.Event()
+        future = loop.run_in_executor(self.executor, self._run_wsgi, scope, body, loop, send, disconnected)
+        # The thread may still read the body after this task is cancelled:
+        # close it when the thread is done, not when we stop waiting
+        future.add_done_callback(lambda _: body.close())
+        watcher = asyncio.ensure_future(self._watch_disconnect(receive, disconnected))
+        try:
+            await asyncio.shield(future)
+        finally:
+            watcher.cancel()
+    
+    @staticmethod
+    async def _read_body(receive) -> Optional[SpooledTemporaryFile]:
+        """Read the request body, or None if the client left before sending it"""
+        body = SpooledTemporaryFile(max_size=MAX_MEMORY_BODY)
+        try:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    body.close()
+                    return None
+                body.write(message.get('body', b''))
+                if not message.get('more_body'):
+                    break
+        except BaseException:
+            body.close()
+            raise
+        body.seek(0)
+        return body
+    
+    @staticmethod
+    async def _watch_disconnect(receive, disconnected: threading.Event):
+        """Tell the app thread to stop streaming once the client is gone"""
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                disconnected.set()
+                return
+    
+    @staticmethod
+    def _headers(scope) -> Dict[str, str]:
+        headers = {}
+        for name, value in scope['headers']:
+            name, value = name.decode('latin1').lower(), value.decode('latin1')
+            if name in headers:
+                # HTTP/2 clients may split the cookie header, which joins with ';'
+                value = f'{headers[name]}; {value}' if name == 'cookie' else f'{headers[name]},{value}'
+            headers[name] = value
+        return headers
+    
+    @staticmethod
+    def _url_root(scope, headers: Dict[str, str]) -> str:
+        """request.url_root as Flask would compute it"""
+        host = headers.get('host')
+        if not host:
+            server_host, port = scope.get('server') or ('localhost', 80)
+            host = f'{server_host}:{port}'
+        return f"{scope.get('scheme', 'http')}://{host}{scope.get('root_path', '')}/"
+    
+    async def _prerender_qr(self, scope):
+        """Render an uncached QR code off the request threads, once per burst"""
+        headers = self._headers(scope)
+        query = parse_qs(scope['query_string'].decode('latin1'), keep_blank_values=True)
+        requested = query['target'][0] if 'target' in query else None
+        target = QRService.resolve_target(requested, self._url_root(scope, headers))
+        fmt = QR_PATHS[scope['path']]
+        
+        if QRService.is_cached(target, fmt):
+            return
+        # Revalidations of known codes are answered without rendering
+        if 'if-none-match' in headers and QRService.get_etag(target, fmt):
+            return
+        
+        key = (target, fmt)
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.qr_executor, QRService.render, target, fmt)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        try:
+            await asyncio.shield(future)
+        except Exception:
+            # The view renders again and reports the error
+            pass
+    
+    def _environ(self, scope, body) -> Dict:
+        """Build the WSGI environ for an HTTP scope"""
+        root_path = scope.get('root_path', '')
+        path = scope['path']
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        server_host, server_port = scope.get('server') or ('localhost', 80)
+        
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': root_path.encode('utf-8').decode('latin1'),
+            'PATH_INFO': path.encode('utf-8').decode('latin1'),
+            'QUERY_STRING': scope['query_string'].decode('latin1'),
+            'SERVER_NAME': server_host,
+            'SERVER_PORT': str(server_port),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        if scope.get('client'):
+            environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+        
+        for name, value in self._headers(scope).items():
+            if name == 'content-type':
+                environ['CONTENT_TYPE'] = value
+            elif name == 'content-length':
+                environ['CONTENT_LENGTH'] = value
+            else:
+                environ['HTTP_' + name.upper().replace('-', '_')] = value
+        return environ
+    
+    def _run_wsgi(self, scope, body, loop, send, disconnected: threading.Event):
+        """Run the Flask app in a pool thread, sending the response back to the loop"""
+        def send_sync(message: Dict):
+            try:
+                asyncio.run_coroutine_threadsafe(send(message), loop).result()
+            except OSError:
+                # Servers may raise once the client is gone (ASGI spec 2.4)
+                disconnected.set()
+        
+        started: Optional[Dict] = None
+        sent = False
+        
+        def start_response(status: str, headers, exc_info=None):
+            nonlocal started
+            if exc_info and sent:
+                raise exc_info[1].with_traceback(exc_info[2])
+            started = {
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [(name.lower().encode('latin1'), value.encode('latin1'))
+                            for name, value in headers]
+            }
+        
+        result = self.wsgi_app(self._environ(scope, body), start_response)
+        try:
+            for chunk in result:
+                # Stop producing chunks nobody will receive
+                if disconnected.is_set():
+                    return
+                if not chunk:
+                    continue
+                if not sent:
+                    send_sync(started)
+                    sent = True
+                send_sync({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not sent:
+                send_sync(started)
+            send_sync({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+
+def create_asgi_app():
+    """Create the Flask app and wrap it for an ASGI server"""
+    from app import create_app
+    return AsyncPortal(create_app())
\ No newline at end of file
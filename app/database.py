@@ -1,3 +1,9 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from flask import g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlmodel import create_engine, SQLModel, Session
 from pathlib import Path
 import os
@@ -9,13 +15,172 @@ data_dir.mkdir(exist_ok=True)
 # Database URL
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{data_dir}/portal.db")
 
+# Connection pool per worker process; with N gunicorn workers the server
+# sees up to N * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# SQLite profile, applied to every new connection
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # Negative values are KiB rather than pages
+    "cache_size": -int(os.getenv("SQLITE_CACHE_KB", "20000")),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+}
+
+
+def _engine_options(url) -> dict:
+    """Engine keyword arguments for the database backend"""
+    if url.get_backend_name() == "sqlite":
+        options = {"connect_args": {"check_same_thread": False}}
+        # In-memory databases live in a single connection
+        if url.database and url.database != ":memory:":
+            options.update(pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW, pool_timeout=POOL_TIMEOUT)
+        return options
+    
+    return {
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        # Drop connections the server closed while the worker was idle
+        "pool_pre_ping": True,
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply SQLITE_PRAGMAS to a new connection"""
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
 # Create engine
+_url = make_url(DATABASE_URL)
 engine = create_engine(
     DATABASE_URL, 
-    connect_args={"check_same_thread": False},
-    echo=False
+    echo=False,
+    **_engine_options(_url)
 )
 
+if _url.get_backend_name() == "sqlite":
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+
+
+@contextmanager
+def db_session() -> Iterator[Session]:
+    """Session shared by every service call of the current request
+    
+    Outside an app context each use gets its own short-lived session.
+    """
+    if not has_app_context():
+        with Session(engine) as session:
+            yield session
+        return
+    
+    session = g.get("db_session")
+    if session is None:
+        session = g.db_session = Session(engine)
+    try:
+        yield session
+    except Exception:
+        # Leave the session usable for the rest of the request
+        session.rollback()
+        raise
+
+
+def query_budget(limit: int) -> Callable:
+    """Declare the most queries a view or service call may issue with cold caches
+    
+    Only sets an attribute; the tests enforce it (see test_query_budgets.py).
+    """
+    def decorate(func):
+        func.query_budget = limit
+        return func
+    return decorate
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request or call issued more queries than its budget allows"""
+
+
+class QueryLog:
+    """Statements executed on the engine while count_queries() is active"""
+    
+    # Same statement with this many different parameters in one request: likely N+1
+    REPEAT_THRESHOLD = 3
+    
+    def __init__(self):
+        # (request label or None, statement, parameters)
+        self.statements: List[Tuple[Optional[str], str, Any]] = []
+    
+    def __len__(self) -> int:
+        return len(self.statements)
+    
+    def clear(self):
+        self.statements.clear()
+    
+    def by_request(self) -> Dict[Optional[str], List[Tuple[str, Any]]]:
+        """Statements grouped by 'METHOD /path' (None outside requests)"""
+        grouped = defaultdict(list)
+        for label, statement, parameters in self.statements:
+            grouped[label].append((statement, parameters))
+        return dict(grouped)
+    
+    def repeated(self, threshold: Optional[int] = None) -> List[Tuple[Optional[str], str, int]]:
+        """(request, statement, executions) for statements run with >= threshold parameter sets"""
+        threshold = threshold or self.REPEAT_THRESHOLD
+        suspects = []
+        for label, statements in self.by_request().items():
+            counts = defaultdict(int)
+            parameters = defaultdict(set)
+            for statement, params in statements:
+                counts[statement] += 1
+                parameters[statement].add(repr(params))
+            suspects.extend((label, statement, count) for statement, count in counts.items()
+                            if len(parameters[statement]) >= threshold)
+        return suspects
+    
+    def check(self, budget: int, what: str = 'block'):
+        """Raise QueryBudgetExceeded listing the statements if over budget or N+1-like"""
+        problems = []
+        for label, statements in self.by_request().items():
+            if len(statements) > budget:
+                listing = '\n'.join(f'  {statement} {parameters!r}' for statement, parameters in statements)
+                problems.append(f'{label or what}: {len(statements)} queries, budget {budget}:\n{listing}')
+        for label, statement, count in self.repeated():
+            problems.append(f'{label or what}: likely N+1, {count} executions of:\n  {statement}')
+        if problems:
+            raise QueryBudgetExceeded('\n'.join(problems))
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryLog]:
+    """Record every statement executed on the engine, tagged with its request"""
+    log = QueryLog()
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        label = f'{request.method} {request.full_path.rstrip("?")}' if has_request_context() else None
+        log.statements.append((label, statement, parameters))
+    
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield log
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+def close_request_session(exception=None):
+    """teardown_appcontext hook closing the request's session"""
+    session = g.pop("db_session", None)
+    if session is not None:
+        session.close()
+
 
 def create_db_and_tables():
     """Create all database tables"""
@@ -31,14 +196,19 @@ def get_session():
 def init_database():
     """Initialize database with default data"""
     from app.models import StandardHours, Settings
-    import yaml
+    # Registers the listeners that bump the data version on writes
+    from app.services.data_version import DataVersionService  # noqa: F401
+    from app.services.config import ConfigService
     from datetime import datetime
     
     create_db_and_tables()
     
+    # Bring indexes and constraints of existing databases up to date
+    from app.migrations import run_migrations
+    run_migrations(engine)
+    
     # Load config
-    with open('config.yml', 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+    config = ConfigService.to_dict()
     
     with Session(engine) as session:
         # Check if already initialized
@@ -55,6 +225,12 @@ def init_database():
             )
             session.add(hours)
         
+        # Exception days and availability slots listed in the config
+        from app.services.imports import ImportService
+        ImportService.apply(session, ImportService.validate(
+            source=ConfigService.CONFIG_PATH, **ImportService.from_config(config)
+        ))
+        
         # Mark as initialized
         session.add(Settings(
             key="initialized",
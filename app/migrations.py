@@ -0,0 +1,94 @@
+"""Versioned schema migrations for existing databases
+
+create_all() only creates missing tables, so indexes and constraints added
+to the models later never reach an existing portal.db. Each migration runs
+once, in order, in its own transaction; the last applied version is kept in
+Settings under 'schema_version'. Statements must be idempotent because a
+fresh database already gets everything from the models.
+"""
+
+from datetime import datetime
+from typing import Callable, List, Tuple
+from sqlalchemy import text
+from sqlmodel import Session
+from app.models import Settings
+
+SETTINGS_KEY = 'schema_version'
+
+
+def _index_hot_queries(session: Session):
+    """Indexes for the latest status, weekly hours and announcements"""
+    session.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_status_created_at ON status (created_at)"
+    ))
+    
+    # The schedule always used the first row per day; drop the others
+    session.execute(text(
+        "DELETE FROM standardhours WHERE id NOT IN "
+        "(SELECT MIN(id) FROM standardhours GROUP BY day_of_week)"
+    ))
+    session.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_standardhours_day_of_week "
+        "ON standardhours (day_of_week)"
+    ))
+    
+    session.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_announcement_lang_active_created_at "
+        "ON announcement (lang, active, created_at)"
+    ))
+
+
+def _index_announcement_pages(session: Session):
+    """Include id in the announcement index, the tie-breaker of the page cursor"""
+    session.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_announcement_lang_active_created_id "
+        "ON announcement (lang, active, created_at, id)"
+    ))
+    session.execute(text("DROP INDEX IF EXISTS ix_announcement_lang_active_created_at"))
+
+
+def _unique_exception_dates(session: Session):
+    """One exception per date, so concurrent imports cannot insert the same day twice"""
+    # The schedule always used the first row per date; drop the others
+    session.execute(text(
+        "DELETE FROM hourexception WHERE id NOT IN "
+        "(SELECT MIN(id) FROM hourexception GROUP BY exception_date)"
+    ))
+    session.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_hourexception_exception_date "
+        "ON hourexception (exception_date)"
+    ))
+    session.execute(text("DROP INDEX IF EXISTS ix_hourexception_exception_date"))
+
+
+# (version, migration), append only
+MIGRATIONS: List[Tuple[int, Callable[[Session], None]]] = [
+    (1, _index_hot_queries),
+    (2, _index_announcement_pages),
+    (3, _unique_exception_dates),
+]
+
+
+def get_schema_version(session: Session) -> int:
+    """Get the last applied migration version"""
+    row = session.get(Settings, SETTINGS_KEY)
+    return row.value.get('version', 0) if row else 0
+
+
+def run_migrations(engine) -> List[int]:
+    """Apply pending migrations and return their versions"""
+    applied = []
+    with Session(engine) as session:
+        current = get_schema_version(session)
+        for version, migration in MIGRATIONS:
+            if version <= current:
+                continue
+            
+            migration(session)
+            row = session.get(Settings, SETTINGS_KEY) or Settings(key=SETTINGS_KEY)
+            row.value = {'version': version, 'name': migration.__name__}
+            row.updated_at = datetime.utcnow()
+            session.add(row)
+            session.commit()
+            applied.append(version)
+    return applied
\ No newline at end of file
@@ -1,7 +1,7 @@
 from typing import Optional, List, Any
 from datetime import datetime, date
 from sqlmodel import Field, SQLModel, Column
-from sqlalchemy import JSON
+from sqlalchemy import JSON, Index
 from enum import Enum
 
 
@@ -21,12 +21,16 @@ class Status(SQLModel, table=True):
     date_to: Optional[date] = None
     description: Optional[str] = None
     next_return: Optional[date] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
 class StandardHours(SQLModel, table=True):
     """Standard weekly opening hours"""
+    __table_args__ = (
+        Index('ux_standardhours_day_of_week', 'day_of_week', unique=True),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     day_of_week: int = Field(ge=0, le=6)  # 0=Monday, 6=Sunday
     time_ranges: List[str] = Field(default_factory=list, sa_column=Column(JSON))
@@ -35,8 +39,13 @@ class StandardHours(SQLModel, table=True):
 
 class HourException(SQLModel, table=True):
     """Exceptions to standard hours (holidays, special days)"""
+    __table_args__ = (
+        # One exception per day; imports upsert by date
+        Index('ux_hourexception_exception_date', 'exception_date', unique=True),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
-    exception_date: date = Field(index=True)
+    exception_date: date
     closed: bool = Field(default=False)
     time_ranges: List[str] = Field(default_factory=list, sa_column=Column(JSON))
     note: Optional[str] = None
@@ -53,6 +62,11 @@ class Availability(SQLModel, table=True):
 
 class Announcement(SQLModel, table=True):
     """News and announcements"""
+    __table_args__ = (
+        # Active announcements of one language, keyset-paginated newest first
+        Index('ix_announcement_lang_active_created_id', 'lang', 'active', 'created_at', 'id'),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     lang: str = Field(default="de", index=True)
     title: str
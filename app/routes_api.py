@@ -0,0 +1,120 @@
+from flask import Blueprint, abort, jsonify, request, Response, stream_with_context
+from datetime import date, datetime, timedelta
+from app.database import query_budget
+from app.models import StatusType
+from app.services import StatusService, ScheduleService
+import json
+import os
+
+api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+# Longest range a single /schedule request may cover
+MAX_RANGE_DAYS = int(os.getenv('API_MAX_RANGE_DAYS', '731'))
+
+
+def _dumps(value) -> str:
+    """Compact JSON"""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def _minutes(time_ranges):
+    """Convert ['08:30-12:00'] to [[510, 720]]"""
+    return [list(ScheduleService.time_range_to_minutes(time_range)) for time_range in time_ranges]
+
+
+def _parse_date(name: str, default: date) -> date:
+    """Read a YYYY-MM-DD query parameter"""
+    value = request.args.get(name)
+    if not value:
+        return default
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        abort(400, f"'{name}' must be a date in YYYY-MM-DD format")
+
+
+@api_bp.errorhandler(400)
+def bad_request(error):
+    """JSON body for invalid parameters"""
+    return jsonify({'error': error.description}), 400
+
+
+@api_bp.route('/schedule')
+@query_budget(4)
+def schedule():
+    """Opening hours for [from, to]: weekly template once, then deviating days"""
+    today = datetime.now(ScheduleService.TIMEZONE).date()
+    start_date = _parse_date('from', today)
+    end_date = _parse_date('to', start_date + timedelta(days=6))
+    
+    if end_date < start_date:
+        abort(400, "'to' must not be before 'from'")
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        abort(400, f"range must not exceed {MAX_RANGE_DAYS} days")
+    
+    weekly = ScheduleService.get_weekly_template()
+    
+    def generate():
+        # Header object without its closing brace, followed by the days array
+        yield _dumps({
+            'timezone': ScheduleService.TIMEZONE.zone,
+            'from': start_date,
+            'to': end_date,
+            'weekly': {str(day): _minutes(ranges) for day, ranges in weekly.items()}
+        })[:-1]
+        yield ',"days":['
+        
+        # Day by day so long ranges never sit in memory, with one exceptions query
+        first = True
+        for day in ScheduleService.iter_schedule_range(start_date, end_date):
+            # Days following the weekly template are implied
+            if not day['is_exception']:
+                continue
+            
+            item = {
+                'date': day['date'],
+                'closed': day['closed'],
+                'ranges': [] if day['closed'] else _minutes(day['time_ranges'])
+            }
+            if day['note']:
+                item['note'] = day['note']
+            yield ('' if first else ',') + _dumps(item)
+            first = False
+        
+        yield ']}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+@api_bp.route('/status')
+@query_budget(4)
+def status():
+    """Current status"""
+    current = StatusService.get_current_status()
+    return jsonify({
+        'type': current.type.value,
+        'date_from': current.date_from.isoformat() if current.date_from else None,
+        'date_to': current.date_to.isoformat() if current.date_to else None,
+        'description': current.description,
+        'next_return': current.next_return.isoformat() if current.next_return else None,
+        'available': current.type == StatusType.ANWESEND
+    })
+
+
+@api_bp.route('/open-now')
+@query_budget(3)
+def open_now():
+    """Whether the lab is open now, and when that changes"""
+    # The real transition, not the midnight-capped page-cache bucket
+    is_open, changes_at = ScheduleService.get_state()
+    next_open = None if is_open else ScheduleService.get_next_open_time()
+    
+    return jsonify({
+        'open': is_open,
+        'changes_at': changes_at.isoformat() if changes_at else None,
+        'next_open': {
+            'date': next_open['date'].isoformat(),
+            'time': next_open['time'],
+            'range': list(ScheduleService.time_range_to_minutes(next_open['time_range']))
+        } if next_open else None
+    })
\ No newline at end of file
@@ -1,16 +1,18 @@
-from flask import Blueprint, jsonify, render_template, request, redirect, url_for, Response
+from flask import Blueprint, abort, jsonify, render_template, request, redirect, url_for, Response
 from datetime import datetime, date
-from app.services import StatusService, ScheduleService, I18nService
+from app.services import StatusService, ScheduleService, I18nService, AnnouncementService
 from app.services.qr import QRService
-from app.models import Announcement
-from app.database import engine
-from sqlmodel import Session, select
-import yaml
-import os
+from app.services.calendar import CalendarService
+from app.services.compression import CompressionService
+from app.services.config import ConfigService
+from app.services.metrics import MetricsService
+from app.services.page_cache import cached_page
+from app.database import query_budget
 
 public_bp = Blueprint('public', __name__)
 
 @public_bp.route('/healthz')
+@query_budget(0)
 def health_check():
     """Health check endpoint"""
     return jsonify({
@@ -18,7 +20,19 @@ def health_check():
         'service': 'qr-info-portal'
     }), 200
 
+@public_bp.route('/metrics')
+@query_budget(0)
+def metrics():
+    """Prometheus metrics of this worker process"""
+    if not MetricsService.ENABLED:
+        return Response('metrics disabled\n', status=404, mimetype='text/plain')
+    response = Response(MetricsService.render(), content_type=MetricsService.CONTENT_TYPE)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 @public_bp.route('/')
+@query_budget(7)
+@cached_page
 def home():
     """Home page with today's status and hours"""
     # Get current status
@@ -31,27 +45,21 @@ def home():
     # Get current language
     lang = I18nService.get_current_language()
     
-    # Get announcements for current language
-    with Session(engine) as session:
-        announcements = session.exec(
-            select(Announcement).where(
-                Announcement.lang == lang,
-                Announcement.active == True
-            ).order_by(Announcement.created_at.desc())
-        ).all()
+    # Newest announcements for current language (cached until the next write)
+    announcements = AnnouncementService.get_front_page(lang)
     
     # Check if currently open
     is_open = ScheduleService.is_open_now()
     next_open = ScheduleService.get_next_open_time() if not is_open else None
     
-    # Load config for contact info
-    with open('config.yml', 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+    # Config snapshot for contact info (parsed once, reloaded on change)
+    config = ConfigService.get()
     
     return render_template('home.html',
         status=status,
         today_hours=today_hours,
-        announcements=announcements,
+        announcements=announcements.items,
+        older_announcements=announcements.next_cursor,
         is_open=is_open,
         next_open=next_open,
         config=config,
@@ -59,6 +67,8 @@ def home():
     )
 
 @public_bp.route('/week')
+@query_budget(6)
+@cached_page
 def week_view():
     """Week view of opening hours"""
     # Get week parameter
@@ -84,6 +94,8 @@ def week_view():
     )
 
 @public_bp.route('/month')
+@query_budget(6)
+@cached_page
 def month_view():
     """Month view of opening hours"""
     # Get month/year parameters
@@ -115,31 +127,85 @@ def month_view():
         today=datetime.now(ScheduleService.TIMEZONE).date()
     )
 
+@public_bp.route('/announcements')
+@query_budget(4)
+@cached_page
+def announcements_view():
+    """All active announcements, one page at a time, newest first"""
+    lang = I18nService.get_current_language()
+    before = request.args.get('before')
+    try:
+        page = AnnouncementService.get_page(lang, AnnouncementService.PAGE_SIZE, before)
+    except ValueError:
+        abort(400)
+    
+    return render_template('announcements.html',
+        announcements=page.items,
+        next_cursor=page.next_cursor,
+        is_first_page=not before
+    )
+
 @public_bp.route('/set-language/<language>')
+@query_budget(0)
 def set_language(language):
     """Set user language preference"""
     I18nService.set_language(language)
     # Redirect to referrer or home
     return redirect(request.referrer or url_for('public.home'))
 
+def _qr_response(fmt: str, mimetype: str) -> Response:
+    """Serve a cached QR code with a content-hash ETag"""
+    # Get target URL from params or use site URL
+    target = QRService.resolve_target(request.args.get('target'), request.url_root)
+    
+    # Answer revalidations from the ETag index without rendering
+    etag = QRService.get_etag(target, fmt)
+    if etag and CompressionService.etag_matches(etag):
+        response = Response(status=304)
+    else:
+        payload, etag = QRService.render(target, fmt)
+        if CompressionService.etag_matches(etag):
+            response = Response(status=304)
+        else:
+            response = Response(payload, mimetype=mimetype)
+            # Compressed variants are stored once per rendered payload
+            response.compression_key = f'qr:{etag}'
+    
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = QRService.CACHE_MAX_AGE
+    return response
+
 @public_bp.route('/qr')
+@query_budget(0)
 def qr_png():
     """Generate QR code as PNG"""
-    # Get target URL from params or use site URL
-    target = request.args.get('target', os.getenv('SITE_URL', request.url_root))
-    
-    # Generate PNG
-    png_data = QRService.generate_qr_png(target)
-    
-    return Response(png_data, mimetype='image/png')
+    return _qr_response('png', 'image/png')
 
 @public_bp.route('/qr.svg')
+@query_budget(0)
 def qr_svg():
     """Generate QR code as SVG"""
-    # Get target URL from params or use site URL
-    target = request.args.get('target', os.getenv('SITE_URL', request.url_root))
-    
-    # Generate SVG
-    svg_data = QRService.generate_qr_svg(target)
-    
-    return Response(svg_data, mimetype='image/svg+xml')
\ No newline at end of file
+    return _qr_response('svg', 'image/svg+xml')
+
+@public_bp.route('/calendar.ics')
+@query_budget(5)
+def calendar_ics():
+    """Opening hours as a subscribable iCalendar feed"""
+    lang = request.args.get('lang')
+    if lang not in I18nService.SUPPORTED_LANGUAGES:
+        lang = I18nService.get_current_language()
+    
+    payload, etag = CalendarService.get_feed(lang)
+    if CompressionService.etag_matches(etag):
+        response = Response(status=304)
+    else:
+        # The feed is cached in memory already, so streaming it would save
+        # nothing and skip the compressed-variant cache
+        response = Response(payload, mimetype='text/calendar')
+        response.compression_key = f'ics:{etag}'
+    
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response
\ No newline at end of file
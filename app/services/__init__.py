@@ -2,5 +2,21 @@ from .status import StatusService
 from .schedule import ScheduleService
 from .i18n import I18nService, t
 from .qr import QRService
+from .data_version import DataVersionService
+from .config import ConfigService
+from .compression import CompressionService
+from .page_cache import PageCache, cached_page
+from .calendar import CalendarService
+from .fragment_cache import FragmentCache
+from .imports import ImportService
+from .snapshot import SnapshotService
+from .metrics import MetricsService
+from .announcements import AnnouncementService
 
-__all__ = ['StatusService', 'ScheduleService', 'I18nService', 't', 'QRService']
\ No newline at end of file
+__all__ = [
+    'StatusService', 'ScheduleService', 'I18nService', 't', 'QRService',
+    'DataVersionService', 'ConfigService', 'CompressionService', 'PageCache',
+    'cached_page', 'CalendarService', 'FragmentCache',
+    'ImportService', 'SnapshotService', 'MetricsService',
+    'AnnouncementService'
+]
\ No newline at end of file
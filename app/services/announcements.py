@@ -0,0 +1,101 @@
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import and_, or_
+from sqlmodel import select
+from app.database import db_session, query_budget
+from app.models import Announcement
+from app.services.data_version import DataVersionService
+import os
+import threading
+
+
+class AnnouncementPage(NamedTuple):
+    """One page of announcements, newest first"""
+    items: List[Dict]
+    # Cursor of the next (older) page, None on the last page
+    next_cursor: Optional[str]
+
+
+class AnnouncementService:
+    """Active announcements per language, keyset-paginated by (created_at, id)"""
+    
+    # Announcements on the home page; the rest is on /announcements
+    FRONT_PAGE_LIMIT = int(os.getenv('ANNOUNCEMENTS_FRONT_PAGE_LIMIT', '5'))
+    PAGE_SIZE = int(os.getenv('ANNOUNCEMENTS_PAGE_SIZE', '20'))
+    
+    # language -> (data version, limit, front page)
+    _front_pages = {}
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def encode_cursor(item: Dict) -> str:
+        """Position after an item, e.g. '2025-01-31T08:00:00_42'"""
+        return f"{item['created_at'].isoformat()}_{item['id']}"
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """Parse a cursor, raising ValueError if it is malformed"""
+        created_at, _, announcement_id = cursor.rpartition('_')
+        if not created_at:
+            raise ValueError(f"invalid cursor {cursor!r}")
+        return datetime.fromisoformat(created_at), int(announcement_id)
+    
+    @staticmethod
+    @query_budget(1)
+    def get_page(lang: str, limit: int, before: Optional[str] = None) -> AnnouncementPage:
+        """Get up to limit active announcements older than the cursor"""
+        query = select(Announcement).where(
+            Announcement.lang == lang,
+            Announcement.active == True
+        )
+        if before:
+            created_at, announcement_id = AnnouncementService.decode_cursor(before)
+            # The range on created_at keeps the index usable, the OR breaks ties
+            query = query.where(
+                Announcement.created_at <= created_at,
+                or_(Announcement.created_at < created_at,
+                    and_(Announcement.created_at == created_at, Announcement.id < announcement_id))
+            )
+        
+        # One extra row tells whether an older page exists
+        with db_session() as session:
+            rows = session.exec(
+                query.order_by(Announcement.created_at.desc(), Announcement.id.desc()).limit(limit + 1)
+            ).all()
+            items = [{
+                'id': row.id,
+                'title': row.title,
+                'body': row.body,
+                'created_at': row.created_at
+            } for row in rows[:limit]]
+        
+        next_cursor = AnnouncementService.encode_cursor(items[-1]) if len(rows) > limit else None
+        return AnnouncementPage(items, next_cursor)
+    
+    @classmethod
+    @query_budget(2)
+    def get_front_page(cls, lang: str) -> AnnouncementPage:
+        """Get the newest announcements, cached per language until the next write"""
+        version = DataVersionService.get_version()
+        entry = cls._front_pages.get(lang)
+        if entry and entry[0] == version and entry[1] == cls.FRONT_PAGE_LIMIT:
+            return entry[2]
+        
+        page = cls.get_page(lang, cls.FRONT_PAGE_LIMIT)
+        with cls._lock:
+            cls._front_pages[lang] = (version, cls.FRONT_PAGE_LIMIT, page)
+        return page
+    
+    @staticmethod
+    def set_active(announcement_id: int, active: bool) -> Optional[Announcement]:
+        """Show or hide an announcement; the write bumps the data version"""
+        with db_session() as session:
+            announcement = session.get(Announcement, announcement_id)
+            if announcement is None:
+                return None
+            announcement.active = active
+            announcement.updated_at = datetime.utcnow()
+            session.add(announcement)
+            session.commit()
+            session.refresh(announcement)
+            return announcement
\ No newline at end of file
@@ -0,0 +1,204 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+from app.models import StatusType
+from app.services.config import ConfigService
+from app.services.data_version import DataVersionService
+from app.services.i18n import I18nService
+from app.services.schedule import ScheduleService
+from app.services.status import StatusService
+import hashlib
+import os
+import threading
+
+
+class CalendarService:
+    """iCalendar (.ics) feed of opening hours, built once per data version"""
+    
+    # Exceptions and absences covered by the feed, relative to today
+    PAST_DAYS = 30
+    FUTURE_DAYS = int(os.getenv('CALENDAR_HORIZON_DAYS', '365'))
+    
+    DAY_CODES = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+    
+    STATUS_KEYS = {
+        StatusType.URLAUB: 'on_vacation',
+        StatusType.BILDUNGSURLAUB: 'educational_leave',
+        StatusType.KONGRESS: 'congress',
+        StatusType.SONSTIGES: 'other',
+    }
+    
+    # (data version, config version, language, catalog version, today) -> (payload, etag)
+    _cache = {}
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def _escape(text: str) -> str:
+        """Escape a TEXT value"""
+        return (text.replace('\\', '\\\\').replace(';', '\\;')
+                .replace(',', '\\,').replace('\n', '\\n'))
+    
+    @staticmethod
+    def _fold(line: str) -> str:
+        """Fold a content line at 75 octets"""
+        encoded = line.encode('utf-8')
+        if len(encoded) <= 75:
+            return line
+        
+        parts = []
+        while encoded:
+            limit = 75 if not parts else 74
+            # Never split inside a multi-byte character
+            while limit < len(encoded) and (encoded[limit] & 0xC0) == 0x80:
+                limit -= 1
+            parts.append(encoded[:limit].decode('utf-8'))
+            encoded = encoded[limit:]
+        return '\r\n '.join(parts)
+    
+    @staticmethod
+    def _local(day: date, minutes: int) -> str:
+        """Format a local Asia/Bangkok date-time"""
+        moment = datetime.combine(day, datetime.min.time()) + timedelta(minutes=minutes)
+        return moment.strftime('%Y%m%dT%H%M%S')
+    
+    @staticmethod
+    def _absence(today: date, horizon_end: date) -> Optional[Tuple[date, date, StatusType]]:
+        """Get (first, last, type) of the current absence, if any"""
+        status = StatusService.get_current_status()
+        if status.type == StatusType.ANWESEND:
+            return None
+        
+        first = status.date_from or today
+        if status.date_to:
+            last = status.date_to
+        elif status.next_return:
+            last = status.next_return - timedelta(days=1)
+        else:
+            last = horizon_end
+        return (first, last, status.type) if first <= last else None
+    
+    @classmethod
+    def build_ics(cls, lang: str) -> bytes:
+        """Build the feed: RRULE per weekly range, exceptions as overrides"""
+        def t(key: str) -> str:
+            return I18nService.translate(key, language=lang)
+        
+        tzid = ScheduleService.TIMEZONE.zone
+        today = datetime.now(ScheduleService.TIMEZONE).date()
+        anchor = today - timedelta(days=cls.PAST_DAYS)
+        horizon_end = today + timedelta(days=cls.FUTURE_DAYS)
+        
+        # Stable across workers, so every worker produces the same ETag
+        updated_at = DataVersionService.get_updated_at() or datetime(2000, 1, 1)
+        stamp = updated_at.strftime('%Y%m%dT%H%M%SZ')
+        
+        weekly = ScheduleService.get_weekly_template()
+        days = ScheduleService.get_schedule_range(anchor, horizon_end)
+        
+        # Dates on which the weekly series must not appear
+        excluded = {weekday: set() for weekday in range(7)}
+        overrides = [day for day in days if day['is_exception']]
+        for day in overrides:
+            excluded[day['date'].weekday()].add(day['date'])
+        
+        absence = cls._absence(today, horizon_end)
+        if absence:
+            current = max(absence[0], anchor)
+            while current <= min(absence[1], horizon_end):
+                excluded[current.weekday()].add(current)
+                current += timedelta(days=1)
+        
+        lines = [
+            'BEGIN:VCALENDAR',
+            'VERSION:2.0',
+            'PRODID:-//qr-info-portal//opening hours//EN',
+            'CALSCALE:GREGORIAN',
+            'METHOD:PUBLISH',
+            f"X-WR-CALNAME:{cls._escape(t('site_title'))}",
+            f'X-WR-TIMEZONE:{tzid}',
+            'BEGIN:VTIMEZONE',
+            f'TZID:{tzid}',
+            'BEGIN:STANDARD',
+            'DTSTART:19700101T000000',
+            'TZOFFSETFROM:+0700',
+            'TZOFFSETTO:+0700',
+            'TZNAME:+07',
+            'END:STANDARD',
+            'END:VTIMEZONE',
+        ]
+        
+        def event(uid: str, props: List[str]):
+            lines.extend(['BEGIN:VEVENT', f'UID:{uid}@qr-info-portal', f'DTSTAMP:{stamp}'])
+            lines.extend(props)
+            lines.append('END:VEVENT')
+        
+        # One recurring event per weekly time range
+        for weekday, ranges in weekly.items():
+            first = anchor + timedelta(days=(weekday - anchor.weekday()) % 7)
+            for time_range in ranges:
+                start, end = ScheduleService.time_range_to_minutes(time_range)
+                props = [
+                    f'DTSTART;TZID={tzid}:{cls._local(first, start)}',
+                    f'DTEND;TZID={tzid}:{cls._local(first, end)}',
+                    f'RRULE:FREQ=WEEKLY;BYDAY={cls.DAY_CODES[weekday]}',
+                    f"SUMMARY:{cls._escape(t('opening_hours'))}",
+                ]
+                dates = sorted(excluded[weekday])
+                if dates:
+                    props.append(f'EXDATE;TZID={tzid}:' + ','.join(
+                        cls._local(day, start) for day in dates
+                    ))
+                event(f'hours-{cls.DAY_CODES[weekday]}-{start}-{end}', props)
+        
+        # Exceptions replace the weekly hours on their date
+        for day in overrides:
+            note = [f"DESCRIPTION:{cls._escape(day['note'])}"] if day['note'] else []
+            if day['closed'] or not day['time_ranges']:
+                event(f"closed-{day['date'].isoformat()}", [
+                    f"DTSTART;VALUE=DATE:{day['date'].strftime('%Y%m%d')}",
+                    f"DTEND;VALUE=DATE:{(day['date'] + timedelta(days=1)).strftime('%Y%m%d')}",
+                    f"SUMMARY:{cls._escape(t('closed'))}",
+                    'TRANSP:TRANSPARENT',
+                ] + note)
+                continue
+            
+            for time_range in day['time_ranges']:
+                start, end = ScheduleService.time_range_to_minutes(time_range)
+                event(f"exception-{day['date'].isoformat()}-{start}-{end}", [
+                    f"DTSTART;TZID={tzid}:{cls._local(day['date'], start)}",
+                    f"DTEND;TZID={tzid}:{cls._local(day['date'], end)}",
+                    f"SUMMARY:{cls._escape(t('opening_hours'))}",
+                ] + note)
+        
+        # Absences (vacation, congress, ...) as one all-day event
+        if absence:
+            first, last, status_type = absence
+            event(f'absence-{first.isoformat()}', [
+                f"DTSTART;VALUE=DATE:{first.strftime('%Y%m%d')}",
+                f"DTEND;VALUE=DATE:{(last + timedelta(days=1)).strftime('%Y%m%d')}",
+                f"SUMMARY:{cls._escape(t(cls.STATUS_KEYS[status_type]))}",
+                'TRANSP:TRANSPARENT',
+            ])
+        
+        lines.append('END:VCALENDAR')
+        return ('\r\n'.join(cls._fold(line) for line in lines) + '\r\n').encode('utf-8')
+    
+    @classmethod
+    def get_feed(cls, lang: str) -> Tuple[bytes, str]:
+        """Get (payload, etag), building the feed once per data version"""
+        today = datetime.now(ScheduleService.TIMEZONE).date()
+        key = (DataVersionService.get_version(), ConfigService.get_version(),
+               lang, I18nService.get_catalog_version(lang), today)
+        
+        with cls._lock:
+            entry = cls._cache.get(key)
+        if entry:
+            return entry
+        
+        payload = cls.build_ics(lang)
+        entry = (payload, hashlib.sha256(payload).hexdigest()[:32])
+        with cls._lock:
+            # Only feeds of the current version are worth keeping
+            for stale in [k for k in cls._cache if k[:2] != key[:2] or k[4] != today]:
+                del cls._cache[stale]
+            cls._cache[key] = entry
+        return entry
\ No newline at end of file
@@ -0,0 +1,190 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from flask import current_app, request, Response
+from app.services.metrics import MetricsService
+import gzip
+import os
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CompressionService:
+    """Content-Encoding negotiation with a compress-once store for cacheable bodies"""
+    
+    COMPRESSIBLE_MIMETYPES = {
+        'text/html', 'text/plain', 'text/css', 'text/calendar',
+        'image/svg+xml', 'application/json', 'application/javascript',
+    }
+    
+    # Bodies smaller than this are not worth the CPU
+    MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '512'))
+    
+    # Total bytes of compressed variants kept per worker
+    CACHE_MAX_BYTES = int(os.getenv('COMPRESSION_CACHE_MAX_BYTES', str(8 * 1024 * 1024)))
+    
+    # Static files served from precompressed siblings (see save_qr_files)
+    PRECOMPRESSED_STATIC_PREFIX = 'qr/'
+    
+    FILE_SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+    
+    # (content key, encoding) -> compressed bytes
+    _variants = OrderedDict()
+    _variants_bytes = 0
+    _lock = threading.Lock()
+    _stats = {'hits': 0, 'misses': 0}
+    
+    @staticmethod
+    def available_encodings() -> List[str]:
+        """Get supported encodings, most preferred first"""
+        return ['br', 'gzip'] if brotli else ['gzip']
+    
+    @classmethod
+    def negotiate(cls) -> Optional[str]:
+        """Pick the best encoding the client accepts, or None for identity"""
+        accepted = request.accept_encodings
+        best, best_quality = None, 0
+        for encoding in cls.available_encodings():
+            quality = accepted.quality(encoding)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+    
+    @staticmethod
+    def compress(data: bytes, encoding: str, best: bool = True) -> bytes:
+        """Compress data; best=True for bodies that are compressed once and reused"""
+        with MetricsService.timer('compress'):
+            if encoding == 'br':
+                return brotli.compress(data, quality=11 if best else 5)
+            return gzip.compress(data, compresslevel=9 if best else 6, mtime=0)
+    
+    @classmethod
+    def get_variant(cls, key: str, data: bytes, encoding: str) -> bytes:
+        """Get the compressed variant of a cacheable body, compressing it once"""
+        cache_key = (key, encoding)
+        with cls._lock:
+            variant = cls._variants.get(cache_key)
+            if variant is not None:
+                cls._variants.move_to_end(cache_key)
+                cls._stats['hits'] += 1
+                return variant
+            cls._stats['misses'] += 1
+        
+        variant = cls.compress(data, encoding)
+        with cls._lock:
+            if cache_key not in cls._variants and len(variant) <= cls.CACHE_MAX_BYTES:
+                cls._variants[cache_key] = variant
+                cls._variants_bytes += len(variant)
+                while cls._variants_bytes > cls.CACHE_MAX_BYTES:
+                    _, evicted = cls._variants.popitem(last=False)
+                    cls._variants_bytes -= len(evicted)
+        return variant
+    
+    @classmethod
+    def matching_etag(cls, etag: str) -> Optional[str]:
+        """Get the ETag or encoded variant listed in If-None-Match, if any"""
+        for candidate in [etag] + [f'{etag}-{encoding}' for encoding in cls.FILE_SUFFIXES]:
+            if request.if_none_match.contains(candidate):
+                return candidate
+        return None
+    
+    @classmethod
+    def etag_matches(cls, etag: str) -> bool:
+        """Check If-None-Match against an ETag and its encoded variants"""
+        return cls.matching_etag(etag) is not None
+    
+    @classmethod
+    def save_precompressed(cls, path: str) -> List[str]:
+        """Write compressed siblings (file.gz, file.br) next to a static file"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        
+        written = []
+        for encoding in cls.available_encodings():
+            variant_path = path + cls.FILE_SUFFIXES[encoding]
+            with open(variant_path, 'wb') as f:
+                f.write(cls.compress(data, encoding))
+            written.append(variant_path)
+        return written
+    
+    @classmethod
+    def _serve_precompressed_static(cls, response: Response, encoding: str) -> Response:
+        """Swap a static QR file response for its precompressed sibling"""
+        filename = request.view_args.get('filename', '')
+        if not filename.startswith(cls.PRECOMPRESSED_STATIC_PREFIX):
+            return response
+        
+        variant = filename + cls.FILE_SUFFIXES[encoding]
+        if not os.path.isfile(os.path.join(current_app.static_folder, variant)):
+            return response
+        
+        mimetype = response.mimetype
+        response.close()
+        compressed = current_app.send_static_file(variant)
+        compressed.mimetype = mimetype
+        compressed.headers['Content-Encoding'] = encoding
+        compressed.vary.add('Accept-Encoding')
+        return compressed
+    
+    @classmethod
+    def _echo_variant_etag(cls, response: Response) -> Response:
+        """Answer a 304 with the ETag the client holds, e.g. "<etag>-gzip"
+
+        Views set the plain ETag; a revalidated compressed variant must keep
+        its own, or caches would store an ETag that no longer matches.
+        """
+        etag, weak = response.get_etag()
+        if etag:
+            matched = cls.matching_etag(etag)
+            if matched and matched != etag:
+                response.set_etag(matched, weak)
+                response.vary.add('Accept-Encoding')
+        return response
+    
+    @classmethod
+    def compress_response(cls, response: Response) -> Response:
+        """after_request hook compressing compressible bodies"""
+        if response.status_code == 304:
+            return cls._echo_variant_etag(response)
+        if response.mimetype not in cls.COMPRESSIBLE_MIMETYPES:
+            return response
+        response.vary.add('Accept-Encoding')
+        
+        if response.status_code != 200 or 'Content-Encoding' in response.headers:
+            return response
+        
+        encoding = cls.negotiate()
+        if not encoding:
+            return response
+        
+        if request.endpoint == 'static':
+            return cls._serve_precompressed_static(response, encoding)
+        if response.is_streamed or response.direct_passthrough:
+            return response
+        
+        data = response.get_data()
+        if len(data) < cls.MIN_SIZE:
+            return response
+        
+        # Views mark cacheable bodies with a key; others are compressed per request
+        key = getattr(response, 'compression_key', None)
+        if key:
+            compressed = cls.get_variant(key, data, encoding)
+        else:
+            compressed = cls.compress(data, encoding, best=False)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f'{etag}-{encoding}', weak)
+        return response
+    
+    @classmethod
+    def cache_stats(cls) -> Dict:
+        """Get hit/miss counters and size of the variant store"""
+        with cls._lock:
+            return dict(cls._stats, entries=len(cls._variants), bytes=cls._variants_bytes)
\ No newline at end of file
@@ -0,0 +1,107 @@
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
+from app.services.metrics import MetricsService
+from app.services.snapshot import SnapshotService
+import hashlib
+import os
+import threading
+import time
+import yaml
+
+
+def _freeze(value: Any) -> Any:
+    """Turn parsed YAML into read-only mappings and tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Turn a frozen snapshot back into plain dicts and lists"""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class ConfigService:
+    """Immutable snapshot of config.yml, reloaded only when the file changes"""
+    
+    CONFIG_PATH = os.getenv('CONFIG_PATH', 'config.yml')
+    
+    # Seconds between mtime checks of the config file
+    CHECK_INTERVAL = float(os.getenv('CONFIG_CHECK_INTERVAL', '2.0'))
+    
+    _snapshot = None
+    _version = None
+    _stat = None
+    _checked_at = 0.0
+    _lock = threading.Lock()
+    
+    @classmethod
+    def _load(cls, force: bool = False):
+        """Parse the config file if its mtime/size or content hash changed"""
+        with cls._lock:
+            stat = os.stat(cls.CONFIG_PATH)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            cls._checked_at = time.monotonic()
+            if not force and cls._snapshot is not None and signature == cls._stat:
+                return
+            
+            # Already parsed by another worker (see SnapshotService)
+            shared = None if force else SnapshotService.get_config(signature)
+            if shared:
+                cls._version, config = shared
+                cls._snapshot = _freeze(config)
+                cls._stat = signature
+                return
+            
+            with open(cls.CONFIG_PATH, 'rb') as f:
+                raw = f.read()
+            version = hashlib.sha256(raw).hexdigest()[:16]
+            
+            # Touched but unchanged files are not parsed again
+            if force or version != cls._version:
+                with MetricsService.timer('yaml'):
+                    cls._snapshot = _freeze(yaml.safe_load(raw) or {})
+                cls._version = version
+            cls._stat = signature
+    
+    @classmethod
+    def get(cls) -> Mapping:
+        """Get the current config snapshot"""
+        if cls._snapshot is None or time.monotonic() - cls._checked_at >= cls.CHECK_INTERVAL:
+            cls._load()
+        return cls._snapshot
+    
+    @classmethod
+    def get_version(cls) -> str:
+        """Get the content hash of the current snapshot"""
+        cls.get()
+        return cls._version
+    
+    @classmethod
+    def get_signature(cls) -> Tuple[int, int]:
+        """Get (mtime_ns, size) of the loaded config file"""
+        cls.get()
+        return cls._stat
+    
+    @classmethod
+    def get_mtime(cls) -> float:
+        """Get the modification time of the loaded config file"""
+        cls.get()
+        return cls._stat[0] / 1e9
+    
+    @classmethod
+    def reload(cls) -> Mapping:
+        """Re-read the config file now, regardless of its mtime"""
+        cls._load(force=True)
+        return cls._snapshot
+    
+    @classmethod
+    def to_dict(cls) -> Dict:
+        """Get a mutable deep copy of the current snapshot"""
+        return _thaw(cls.get())
\ No newline at end of file
@@ -0,0 +1,133 @@
+from datetime import datetime
+from itertools import chain
+from typing import Optional
+from flask import g, has_app_context
+from sqlalchemy import event, insert, text
+from sqlmodel import Session, select
+from app.models import Settings, StandardHours, HourException, Status, Announcement
+from app.database import db_session
+import os
+import time
+
+
+class DataVersionService:
+    """Data version counter used to invalidate process-local caches"""
+
+    SETTINGS_KEY = 'data_version'
+
+    # Writes to these models bump the version
+    TRACKED_MODELS = (StandardHours, HourException, Status, Announcement)
+
+    # Increment of the JSON counter in one statement, so concurrent writers
+    # never both read the same old value (SQLite and MySQL syntax by default)
+    INCREMENT_SQL = {
+        'default': (
+            'UPDATE settings SET value = json_set(value, \'$.version\', '
+            'COALESCE(json_extract(value, \'$.version\'), 0) + 1), updated_at = :now '
+            'WHERE "key" = :key'
+        ),
+        'postgresql': (
+            'UPDATE settings SET value = jsonb_set(value::jsonb, \'{version}\', '
+            'to_jsonb(COALESCE((value->>\'version\')::int, 0) + 1))::json, updated_at = :now '
+            'WHERE "key" = :key'
+        ),
+    }
+
+    # Seconds a worker trusts its last seen version before querying again
+    CHECK_INTERVAL = float(os.getenv('DATA_VERSION_TTL', '1.0'))
+
+    _version = None
+    _updated_at = None
+    _checked_at = 0.0
+
+    @classmethod
+    def get_version(cls) -> int:
+        """Get the current data version (one primary-key lookup at most)"""
+        # One version per request, however many services ask for it
+        request_version = g.get('data_version') if has_app_context() else None
+        if request_version is not None:
+            return request_version
+
+        now = time.monotonic()
+        if cls._version is not None and now - cls._checked_at < cls.CHECK_INTERVAL:
+            return cls._remember(cls._version)
+
+        with db_session() as session:
+            row = session.get(Settings, cls.SETTINGS_KEY)
+            version = row.value.get('version', 0) if row else 0
+            cls._updated_at = row.updated_at if row else None
+
+        cls._version = version
+        cls._checked_at = now
+        return cls._remember(version)
+
+    @staticmethod
+    def _remember(version: int) -> int:
+        if has_app_context():
+            g.data_version = version
+        return version
+
+    @classmethod
+    def get_updated_at(cls) -> Optional[datetime]:
+        """Get the UTC time of the last tracked write, if any"""
+        cls.get_version()
+        return cls._updated_at
+
+    @classmethod
+    def invalidate(cls):
+        """Force the next get_version() call to query the database"""
+        cls._version = None
+        if has_app_context():
+            g.pop('data_version', None)
+
+    @classmethod
+    def bump(cls, session: Session) -> Optional[int]:
+        """Increment the version inside the session's current transaction"""
+        # One bump per transaction is enough, however many rows it writes
+        if session.info.get('data_version_bumped'):
+            return None
+
+        now = datetime.utcnow()
+        dialect = session.get_bind().dialect.name
+        statement = cls.INCREMENT_SQL.get(dialect, cls.INCREMENT_SQL['default'])
+        with session.no_autoflush:
+            result = session.execute(text(statement), {'now': now, 'key': cls.SETTINGS_KEY})
+            if result.rowcount == 0:
+                # First tracked write ever (init_database)
+                session.execute(insert(Settings).values(
+                    key=cls.SETTINGS_KEY, value={'version': 1}, updated_at=now
+                ))
+
+            # A copy loaded earlier in this session is stale now
+            loaded = session.identity_map.get(session.identity_key(Settings, cls.SETTINGS_KEY))
+            if loaded is not None:
+                session.expire(loaded)
+            version = session.execute(
+                select(Settings.value).where(Settings.key == cls.SETTINGS_KEY)
+            ).scalar_one()['version']
+
+        session.info['data_version_bumped'] = True
+        return version
+
+
+@event.listens_for(Session, 'before_flush')
+def _bump_on_tracked_write(session, flush_context, instances):
+    """Bump the data version when a tracked model is written"""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, DataVersionService.TRACKED_MODELS):
+            DataVersionService.bump(session)
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    """Let this worker see its own writes immediately, and the others via the snapshot"""
+    if session.info.pop('data_version_bumped', False):
+        DataVersionService.invalidate()
+        from app.services.snapshot import SnapshotService
+        SnapshotService.publish()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _reset_after_rollback(session):
+    session.info.pop('data_version_bumped', None)
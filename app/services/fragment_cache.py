@@ -0,0 +1,91 @@
+from collections import OrderedDict
+from typing import Callable, Dict, List
+from flask import has_request_context, request
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from app.services.config import ConfigService
+from app.services.i18n import I18nService
+import os
+import threading
+
+
+class FragmentCache:
+    """Rendered template fragments that only depend on language and config"""
+    
+    ENABLED = os.getenv('FRAGMENT_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    MAX_ENTRIES = int(os.getenv('FRAGMENT_CACHE_MAX_ENTRIES', '256'))
+    
+    # key -> rendered markup
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+    _stats = {'hits': 0, 'misses': 0}
+    
+    @staticmethod
+    def make_key(name: str, extra: List) -> tuple:
+        """Key a fragment by name, language, translations, config and URL root"""
+        language = I18nService.get_current_language()
+        root = (request.host, request.script_root) if has_request_context() else None
+        return (
+            name,
+            tuple(extra),
+            language,
+            I18nService.get_catalog_version(language),
+            ConfigService.get_version(),
+            root
+        )
+    
+    @classmethod
+    def get_or_render(cls, name: str, extra: List, render: Callable[[], str]) -> Markup:
+        """Return a cached fragment, rendering it on a miss"""
+        if not cls.ENABLED:
+            return Markup(render())
+        
+        key = cls.make_key(name, extra)
+        with cls._lock:
+            html = cls._entries.get(key)
+            if html is not None:
+                cls._entries.move_to_end(key)
+                cls._stats['hits'] += 1
+                return html
+            cls._stats['misses'] += 1
+        
+        html = Markup(render())
+        with cls._lock:
+            cls._entries[key] = html
+            while len(cls._entries) > cls.MAX_ENTRIES:
+                cls._entries.popitem(last=False)
+        return html
+    
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+    
+    @classmethod
+    def cache_stats(cls) -> Dict:
+        """Get hit/miss counters and number of fragments"""
+        with cls._lock:
+            return dict(cls._stats, entries=len(cls._entries))
+
+
+class FragmentCacheExtension(Extension):
+    """{% cache 'name'[, extra, ...] %}...{% endcache %} backed by FragmentCache"""
+    
+    tags = {'cache'}
+    
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        name = parser.parse_expression()
+        
+        # Optional extra values the fragment depends on
+        extra = []
+        while parser.stream.skip_if('comma'):
+            extra.append(parser.parse_expression())
+        
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render_cached', [name, nodes.List(extra)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+    
+    def _render_cached(self, name: str, extra: List, caller: Callable[[], str]) -> Markup:
+        return FragmentCache.get_or_render(name, extra, caller)
\ No newline at end of file
@@ -1,7 +1,19 @@
-from typing import Dict, Optional
-from flask import request, session
+from typing import Callable, Dict, List, NamedTuple, Optional
+from flask import g, has_request_context, request, session
+import hashlib
 import json
 import os
+import string
+import threading
+import time
+
+
+class Catalog(NamedTuple):
+    """Compiled translations of one language"""
+    version: str
+    sources: List
+    messages: Dict[str, str]
+    templates: Dict[str, List]
 
 
 class I18nService:
@@ -10,24 +22,168 @@ class I18nService:
     SUPPORTED_LANGUAGES = ['th', 'de', 'en']
     DEFAULT_LANGUAGE = 'th'
     
+    TRANSLATIONS_DIR = os.path.join(os.path.dirname(__file__), '..', 'translations')
+    
+    # Compiled catalogs, one file per language
+    CATALOG_DIR = os.getenv('I18N_CATALOG_DIR', os.path.join('data', 'i18n'))
+    CATALOG_FORMAT = 1
+    
+    # Seconds between mtime checks of a language's source files
+    CHECK_INTERVAL = float(os.getenv('I18N_CHECK_INTERVAL', '2.0'))
+    
+    # Raw source files, filled by load_translations() only
     translations = {}
     
+    # Loaded lazily, per language, on first use
+    _catalogs = {}
+    _checked_at = {}
+    _translators = {}
+    _lock = threading.Lock()
+    
+    _formatter = string.Formatter()
+    
+    @classmethod
+    def _source_path(cls, language: str) -> str:
+        return os.path.join(cls.TRANSLATIONS_DIR, f'{language}.json')
+    
+    @classmethod
+    def _read_source(cls, language: str) -> Dict[str, str]:
+        """Read one translation source file"""
+        file_path = cls._source_path(language)
+        if not os.path.exists(file_path):
+            return {}
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
     @classmethod
     def load_translations(cls):
         """Load translation files"""
-        translations_dir = os.path.join(os.path.dirname(__file__), '..', 'translations')
-        
         for lang in cls.SUPPORTED_LANGUAGES:
-            file_path = os.path.join(translations_dir, f'{lang}.json')
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    cls.translations[lang] = json.load(f)
-            else:
-                cls.translations[lang] = {}
+            cls.translations[lang] = cls._read_source(lang)
+        
+        # Compiled catalogs are checked against the sources again on next use
+        with cls._lock:
+            cls._catalogs = {}
+            cls._checked_at = {}
+            cls._translators = {}
     
     @classmethod
-    def get_current_language(cls) -> str:
-        """Get current language from session or request"""
+    def _fallback_chain(cls, language: str) -> List[str]:
+        """Languages consulted for a key, most specific first"""
+        return [language] if language == cls.DEFAULT_LANGUAGE else [language, cls.DEFAULT_LANGUAGE]
+    
+    @classmethod
+    def _sources(cls, language: str) -> List:
+        """Get [language, mtime_ns, size] of every source file in the fallback chain"""
+        sources = []
+        for lang in cls._fallback_chain(language):
+            try:
+                stat = os.stat(cls._source_path(lang))
+                sources.append([lang, stat.st_mtime_ns, stat.st_size])
+            except OSError:
+                sources.append([lang, None, None])
+        return sources
+    
+    @classmethod
+    def _parse_template(cls, message: str) -> Optional[List]:
+        """Split a str.format template into [literal, field, spec, conversion] parts"""
+        if '{' not in message and '}' not in message:
+            return None
+        try:
+            return [list(part) for part in cls._formatter.parse(message)]
+        except ValueError:
+            # Not a valid template: always shown verbatim
+            return None
+    
+    @classmethod
+    def compile_catalog(cls, language: str) -> Catalog:
+        """Merge the fallback chain and pre-parse templates for one language"""
+        sources = cls._sources(language)
+        
+        messages = {}
+        for lang in reversed(cls._fallback_chain(language)):
+            messages.update({key: value for key, value in cls._read_source(lang).items() if value})
+        
+        templates = {}
+        for key, message in messages.items():
+            parts = cls._parse_template(message)
+            if parts:
+                templates[key] = parts
+        
+        version = hashlib.sha256(json.dumps(sources).encode('utf-8')).hexdigest()[:16]
+        return Catalog(version, sources, messages, templates)
+    
+    @classmethod
+    def _catalog_path(cls, language: str) -> str:
+        return os.path.join(cls.CATALOG_DIR, f'{language}.catalog.json')
+    
+    @classmethod
+    def _read_catalog(cls, language: str, sources: List) -> Optional[Catalog]:
+        """Read a compiled catalog if it was built from the current sources"""
+        try:
+            with open(cls._catalog_path(language), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if data.get('format') != cls.CATALOG_FORMAT or data.get('sources') != sources:
+            return None
+        return Catalog(data['version'], data['sources'], data['messages'], data['templates'])
+    
+    @classmethod
+    def _write_catalog(cls, language: str, catalog: Catalog):
+        """Write a compiled catalog atomically; a read-only disk only costs a recompile"""
+        path = cls._catalog_path(language)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(cls.CATALOG_DIR, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(dict(catalog._asdict(), format=cls.CATALOG_FORMAT), f,
+                          ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+    
+    @classmethod
+    def _load_catalog(cls, language: str) -> Catalog:
+        """Load a catalog, recompiling it when its source files changed"""
+        with cls._lock:
+            sources = cls._sources(language)
+            cls._checked_at[language] = time.monotonic()
+            
+            catalog = cls._catalogs.get(language)
+            if catalog is not None and catalog.sources == sources:
+                return catalog
+            
+            catalog = cls._read_catalog(language, sources)
+            if catalog is None:
+                catalog = cls.compile_catalog(language)
+                cls._write_catalog(language, catalog)
+            
+            cls._catalogs[language] = catalog
+            for stale in [key for key in cls._translators if key[0] == language]:
+                del cls._translators[stale]
+            return catalog
+    
+    @classmethod
+    def get_catalog(cls, language: str) -> Catalog:
+        """Get the compiled catalog of a language, loading it on first use"""
+        if language not in cls.SUPPORTED_LANGUAGES:
+            language = cls.DEFAULT_LANGUAGE
+        
+        catalog = cls._catalogs.get(language)
+        if catalog is None or time.monotonic() - cls._checked_at.get(language, 0.0) >= cls.CHECK_INTERVAL:
+            catalog = cls._load_catalog(language)
+        return catalog
+    
+    @classmethod
+    def get_catalog_version(cls, language: str) -> str:
+        """Get a hash identifying the loaded translations of a language"""
+        return cls.get_catalog(language).version
+    
+    @classmethod
+    def _resolve_language(cls) -> str:
+        """Resolve the language from session or request"""
         try:
             # Check session first
             if hasattr(session, 'get') and session.get('language'):
@@ -44,51 +200,92 @@ class I18nService:
         
         return cls.DEFAULT_LANGUAGE
     
+    @classmethod
+    def get_current_language(cls) -> str:
+        """Get current language, resolved once per request"""
+        if not has_request_context():
+            return cls._resolve_language()
+        
+        language = g.get('language')
+        if language is None:
+            language = g.language = cls._resolve_language()
+        return language
+    
     @classmethod
     def set_language(cls, language: str):
         """Set language in session"""
         try:
             if language in cls.SUPPORTED_LANGUAGES:
                 session['language'] = language
+                g.language = language
         except RuntimeError:
             # Outside of request context
             pass
     
     @classmethod
-    def translate(cls, key: str, language: Optional[str] = None, **kwargs) -> str:
-        """Translate a key to current or specified language"""
-        if not cls.translations:
-            cls.load_translations()
-        
-        lang = language or cls.get_current_language()
-        
-        # Try to get translation
-        translation = cls.translations.get(lang, {}).get(key)
-        
-        # Fallback to default language
-        if not translation and lang != cls.DEFAULT_LANGUAGE:
-            translation = cls.translations.get(cls.DEFAULT_LANGUAGE, {}).get(key)
-        
-        # Fallback to key itself
-        if not translation:
-            translation = key
-        
-        # Format with parameters if any
+    def _render(cls, parts: List, kwargs: Dict) -> str:
+        """Fill a pre-parsed template"""
+        pieces = []
+        for literal, field, spec, conversion in parts:
+            pieces.append(literal)
+            if field is not None:
+                value = cls._formatter.get_field(field, (), kwargs)[0]
+                if conversion:
+                    value = cls._formatter.convert_field(value, conversion)
+                pieces.append(format(value, spec))
+        return ''.join(pieces)
+    
+    @classmethod
+    def _lookup(cls, catalog: Catalog, key: str, kwargs: Dict) -> str:
+        """Look up a key, filling in parameters if any"""
         if kwargs:
-            try:
-                translation = translation.format(**kwargs)
-            except:
-                pass
+            parts = catalog.templates.get(key)
+            if parts is not None:
+                try:
+                    return cls._render(parts, kwargs)
+                except (KeyError, IndexError, ValueError, AttributeError):
+                    # Missing or malformed parameters: show the template as is
+                    pass
         
-        return translation
+        # Fallback to key itself
+        return catalog.messages.get(key, key)
+    
+    @classmethod
+    def translate(cls, key: str, language: Optional[str] = None, **kwargs) -> str:
+        """Translate a key to current or specified language"""
+        catalog = cls.get_catalog(language or cls.get_current_language())
+        return cls._lookup(catalog, key, kwargs)
+    
+    @classmethod
+    def get_translator(cls, language: str) -> Callable[..., str]:
+        """Get a t() bound to one language's catalog"""
+        catalog = cls.get_catalog(language)
+        translator = cls._translators.get((language, catalog.version))
+        if translator is None:
+            def translator(key: str, **kwargs) -> str:
+                return cls._lookup(catalog, key, kwargs)
+            
+            cls._translators[(language, catalog.version)] = translator
+        return translator
+    
+    @classmethod
+    def template_context(cls) -> Dict:
+        """Context processor: resolve the language once and bind t() to it"""
+        language = cls.get_current_language()
+        return {
+            't': cls.get_translator(language),
+            'get_current_language': lambda: language
+        }
     
     @classmethod
     def get_translations_for_language(cls, language: str) -> Dict:
         """Get all translations for a language"""
-        if not cls.translations:
-            cls.load_translations()
+        if language not in cls.translations:
+            if language not in cls.SUPPORTED_LANGUAGES:
+                return {}
+            cls.translations[language] = cls._read_source(language)
         
-        return cls.translations.get(language, {})
+        return cls.translations[language]
 
 
 # Convenience function for templates
@@ -0,0 +1,218 @@
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+from sqlalchemy import insert, update
+from sqlmodel import Session, select
+from app.database import engine
+from app.models import Availability, HourException
+from app.services.data_version import DataVersionService
+import csv
+import json
+import os
+import re
+
+
+class ImportService:
+    """Validated bulk upserts of exception days and availability slots"""
+    
+    TIME_RANGE_PATTERN = re.compile(r'^(\d{2}):(\d{2})-(\d{2}):(\d{2})$')
+    TRUE_VALUES = ('1', 'true', 'yes', 'y', 'x')
+    
+    @classmethod
+    def _parse_date(cls, value: Any) -> date:
+        if isinstance(value, date):
+            return value
+        try:
+            return date.fromisoformat(str(value).strip())
+        except ValueError:
+            raise ValueError(f"invalid date {value!r}, expected YYYY-MM-DD")
+    
+    @classmethod
+    def _parse_ranges(cls, value: Any) -> List[str]:
+        """Accept a list or a ';'-separated string of 'HH:MM-HH:MM' ranges"""
+        if value in (None, ''):
+            return []
+        items = value if isinstance(value, (list, tuple)) else str(value).split(';')
+        
+        ranges = []
+        for item in items:
+            item = str(item).replace(' ', '')
+            match = cls.TIME_RANGE_PATTERN.match(item)
+            if not match:
+                raise ValueError(f"invalid time range {item!r}, expected HH:MM-HH:MM")
+            start_h, start_m, end_h, end_m = (int(part) for part in match.groups())
+            start, end = start_h * 60 + start_m, end_h * 60 + end_m
+            if start_m > 59 or end_m > 59 or end > 24 * 60 or start >= end:
+                raise ValueError(f"invalid time range {item!r}")
+            ranges.append(item)
+        return sorted(ranges)
+    
+    @classmethod
+    def _parse_bool(cls, value: Any) -> bool:
+        if isinstance(value, bool):
+            return value
+        return str(value or '').strip().lower() in cls.TRUE_VALUES
+    
+    @classmethod
+    def parse_exception(cls, record: Mapping) -> Dict:
+        """Validate one exception day"""
+        time_ranges = cls._parse_ranges(record.get('time_ranges'))
+        closed = cls._parse_bool(record.get('closed'))
+        if closed and time_ranges:
+            raise ValueError("a closed day cannot have time ranges")
+        
+        return {
+            'exception_date': cls._parse_date(record.get('date')),
+            # A day without ranges is closed either way
+            'closed': closed or not time_ranges,
+            'time_ranges': time_ranges,
+            'note': str(record.get('note') or '').strip() or None
+        }
+    
+    @classmethod
+    def parse_availability(cls, record: Mapping) -> Dict:
+        """Validate one day of availability slots"""
+        time_slots = cls._parse_ranges(record.get('time_slots'))
+        if not time_slots:
+            raise ValueError("time_slots must not be empty")
+        
+        return {
+            'availability_date': cls._parse_date(record.get('date')),
+            'time_slots': time_slots
+        }
+    
+    @classmethod
+    def validate(cls, exceptions: Iterable[Mapping] = (),
+                 availability: Iterable[Mapping] = (), source: str = 'input') -> Dict[str, List[Dict]]:
+        """Parse all records, raising one ValueError that lists every problem"""
+        parsed = {'exceptions': [], 'availability': []}
+        errors = []
+        
+        for kind, records, parse, date_key in (
+            ('exceptions', exceptions, cls.parse_exception, 'exception_date'),
+            ('availability', availability, cls.parse_availability, 'availability_date'),
+        ):
+            seen = set()
+            for number, record in enumerate(records, start=1):
+                try:
+                    row = parse(record)
+                except ValueError as e:
+                    errors.append(f"{source}: {kind} #{number}: {e}")
+                    continue
+                if row[date_key] in seen:
+                    errors.append(f"{source}: {kind} #{number}: duplicate date {row[date_key]}")
+                    continue
+                seen.add(row[date_key])
+                parsed[kind].append(row)
+        
+        if errors:
+            raise ValueError('\n'.join(errors))
+        return parsed
+    
+    @classmethod
+    def from_config(cls, config: Mapping) -> Dict[str, List[Mapping]]:
+        """Get raw records from hours.exceptions and availability.indicative_slots"""
+        return {
+            'exceptions': list((config.get('hours') or {}).get('exceptions') or []),
+            'availability': list((config.get('availability') or {}).get('indicative_slots') or [])
+        }
+    
+    @classmethod
+    def read_file(cls, path: str, kind: Optional[str] = None) -> Dict[str, List[Mapping]]:
+        """Get raw records from a JSON or CSV file
+
+        JSON holds either {"exceptions": [...], "availability": [...]} or a
+        plain list of records of the given kind. CSV always needs a kind.
+        """
+        records = {'exceptions': [], 'availability': []}
+        extension = os.path.splitext(path)[1].lower()
+        
+        if extension == '.json':
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, list):
+                if kind not in records:
+                    raise ValueError(f"{path}: a list of records needs --kind exceptions|availability")
+                records[kind] = data
+            else:
+                for key in records:
+                    records[key] = list(data.get(key) or [])
+            return records
+        
+        if extension == '.csv':
+            if kind not in records:
+                raise ValueError(f"{path}: CSV files need --kind exceptions|availability")
+            with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+                reader = csv.DictReader(f)
+                missing = {'date'} - set(reader.fieldnames or [])
+                if missing:
+                    raise ValueError(f"{path}: missing column(s) {', '.join(sorted(missing))}")
+                records[kind] = list(reader)
+            return records
+        
+        raise ValueError(f"{path}: unsupported file type, use .json or .csv")
+    
+    @staticmethod
+    def _upsert(session: Session, model, date_key: str, fields: List[str], rows: List[Dict]) -> Dict:
+        """Insert or update one row per date with two bulk statements"""
+        report = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        if not rows:
+            return report
+        
+        date_column = getattr(model, date_key)
+        dates = [row[date_key] for row in rows]
+        existing = {}
+        for current in session.exec(
+            select(model).where(date_column >= min(dates), date_column <= max(dates))
+            .order_by(date_column, model.id)
+        ).all():
+            # The schedule reads the first row per date
+            existing.setdefault(getattr(current, date_key), current)
+        
+        now = datetime.utcnow()
+        inserts, updates = [], []
+        for row in rows:
+            current = existing.get(row[date_key])
+            if current is None:
+                inserts.append(dict(row, created_at=now))
+            elif any(getattr(current, field) != row[field] for field in fields):
+                updates.append(dict(row, id=current.id))
+            else:
+                report['unchanged'] += 1
+        
+        # executemany under the hood, no per-row ORM objects
+        if inserts:
+            session.execute(insert(model), inserts)
+        if updates:
+            session.execute(update(model), updates)
+        
+        report['inserted'] = len(inserts)
+        report['updated'] = len(updates)
+        return report
+    
+    @classmethod
+    def apply(cls, session: Session, parsed: Dict[str, List[Dict]]) -> Dict:
+        """Upsert validated records into session's transaction (not committed)"""
+        report = {
+            'exceptions': cls._upsert(session, HourException, 'exception_date',
+                                      ['closed', 'time_ranges', 'note'], parsed['exceptions']),
+            'availability': cls._upsert(session, Availability, 'availability_date',
+                                        ['time_slots'], parsed['availability'])
+        }
+        
+        # Bulk statements skip the flush listeners: bump once for the import
+        if any(counts['inserted'] or counts['updated'] for counts in report.values()):
+            DataVersionService.bump(session)
+        return report
+    
+    @classmethod
+    def import_records(cls, exceptions: Iterable[Mapping] = (), availability: Iterable[Mapping] = (),
+                       source: str = 'input', dry_run: bool = False) -> Dict:
+        """Validate and upsert records in a single transaction"""
+        parsed = cls.validate(exceptions, availability, source)
+        with Session(engine) as session:
+            report = cls.apply(session, parsed)
+            if dry_run:
+                session.rollback()
+            else:
+                session.commit()
+        return report
\ No newline at end of file
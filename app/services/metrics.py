@@ -0,0 +1,232 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+from flask import Response, g, has_request_context, request
+from flask.signals import before_render_template, template_rendered
+from sqlalchemy import event
+import os
+import threading
+import time
+
+
+def _label(value) -> str:
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsService:
+    """Per-route latency histograms and time spent per phase (db, template, ...)
+
+    Phases are summed on g during a request and merged into the process-wide
+    counters once, in after_request. Counters are per process: each gunicorn
+    worker reports its own.
+    """
+    
+    ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    SERVER_TIMING = os.getenv('SERVER_TIMING_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    
+    # Histogram bucket bounds in seconds
+    BUCKETS = [float(bound) for bound in os.getenv(
+        'METRICS_BUCKETS', '0.001,0.0025,0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5'
+    ).split(',')]
+    
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+    
+    # cache_stats() fields that can go down; all other numbers only grow
+    CACHE_GAUGES = ('entries', 'bytes', 'data_version')
+    # Fields counted as hits in the hit ratio
+    CACHE_HITS = ('hits', 'disk_hits')
+    
+    # (method, route, status) -> [bucket counts..., +Inf count, sum]
+    _requests = {}
+    # (route, phase) -> [calls, seconds]; route is '' outside requests
+    _phases = {}
+    _lock = threading.Lock()
+    _instrumented = set()
+    
+    @classmethod
+    def init_app(cls, app, engine=None):
+        """Time requests, templates and (if given) queries on engine"""
+        if not cls.ENABLED:
+            return
+        
+        # after_request hooks run in reverse: registered first, it runs last
+        # and so also covers compression
+        app.before_request(cls.start_request)
+        app.after_request(cls.finish_request)
+        before_render_template.connect(cls._template_started, app, weak=False)
+        template_rendered.connect(cls._template_finished, app, weak=False)
+        
+        if engine is not None and id(engine) not in cls._instrumented:
+            event.listen(engine, 'before_cursor_execute', cls._query_started)
+            event.listen(engine, 'after_cursor_execute', cls._query_finished)
+            cls._instrumented.add(id(engine))
+    
+    @staticmethod
+    def start_request():
+        g._metrics_started = time.perf_counter()
+        g._metrics_phases = {}
+    
+    @classmethod
+    def record(cls, phase: str, seconds: float, calls: int = 1):
+        """Add time spent in a phase to the current request (or the global totals)"""
+        if has_request_context():
+            phases = g.get('_metrics_phases')
+            if phases is not None:
+                entry = phases.get(phase)
+                if entry is None:
+                    phases[phase] = [calls, seconds]
+                else:
+                    entry[0] += calls
+                    entry[1] += seconds
+                return
+        
+        with cls._lock:
+            entry = cls._phases.setdefault(('', phase), [0, 0.0])
+            entry[0] += calls
+            entry[1] += seconds
+    
+    @classmethod
+    @contextmanager
+    def timer(cls, phase: str):
+        """Time a block as one call of phase"""
+        if not cls.ENABLED:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.record(phase, time.perf_counter() - started)
+    
+    @staticmethod
+    def _query_started(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_metrics_started', []).append(time.perf_counter())
+    
+    @classmethod
+    def _query_finished(cls, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('_metrics_started')
+        if started:
+            cls.record('db', time.perf_counter() - started.pop())
+    
+    @staticmethod
+    def _template_started(sender, template, context, **extra):
+        g.setdefault('_metrics_templates', []).append(time.perf_counter())
+    
+    @classmethod
+    def _template_finished(cls, sender, template, context, **extra):
+        started = g.get('_metrics_templates')
+        if started:
+            cls.record('template', time.perf_counter() - started.pop())
+    
+    @classmethod
+    def finish_request(cls, response: Response) -> Response:
+        """Merge the request's timings and add the Server-Timing header"""
+        started = g.get('_metrics_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        phases = g.pop('_metrics_phases', {})
+        g.pop('_metrics_started', None)
+        
+        # The rule, not the path, so the number of series stays bounded
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        key = (request.method, route, response.status_code)
+        bucket = bisect_left(cls.BUCKETS, elapsed)
+        
+        with cls._lock:
+            entry = cls._requests.get(key)
+            if entry is None:
+                entry = cls._requests[key] = [0] * (len(cls.BUCKETS) + 1) + [0.0]
+            entry[bucket] += 1
+            entry[-1] += elapsed
+            for phase, (calls, seconds) in phases.items():
+                totals = cls._phases.setdefault((route, phase), [0, 0.0])
+                totals[0] += calls
+                totals[1] += seconds
+        
+        if cls.SERVER_TIMING:
+            timings = [f'{phase};dur={seconds * 1000:.2f};desc="{calls}x"'
+                       for phase, (calls, seconds) in sorted(phases.items())]
+            timings.append(f'total;dur={elapsed * 1000:.2f}')
+            response.headers.add('Server-Timing', ', '.join(timings))
+        return response
+    
+    @staticmethod
+    def _cache_stats() -> Dict[str, Dict]:
+        from app.services import CompressionService, FragmentCache, PageCache, QRService, SnapshotService
+        return {
+            'page': PageCache.cache_stats(),
+            'fragment': FragmentCache.cache_stats(),
+            'compression': CompressionService.cache_stats(),
+            'qr': QRService.cache_stats(),
+            'snapshot': SnapshotService.cache_stats(),
+        }
+    
+    @classmethod
+    def render(cls) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with cls._lock:
+            requests = {key: list(entry) for key, entry in cls._requests.items()}
+            phases = {key: list(entry) for key, entry in cls._phases.items()}
+        
+        lines = [
+            '# HELP portal_request_duration_seconds Request latency by route',
+            '# TYPE portal_request_duration_seconds histogram',
+        ]
+        for (method, route, status), entry in sorted(requests.items()):
+            labels = f'method="{method}",route="{_label(route)}",status="{status}"'
+            cumulative = 0
+            for bound, count in zip(cls.BUCKETS + ['+Inf'], entry[:-1]):
+                cumulative += count
+                lines.append(f'portal_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'portal_request_duration_seconds_sum{{{labels}}} {entry[-1]:.6f}')
+            lines.append(f'portal_request_duration_seconds_count{{{labels}}} {cumulative}')
+        
+        lines += [
+            '# HELP portal_phase_calls_total Calls per phase (db = queries) by route',
+            '# TYPE portal_phase_calls_total counter',
+        ]
+        lines += [f'portal_phase_calls_total{{route="{_label(route)}",phase="{phase}"}} {calls}'
+                  for (route, phase), (calls, _) in sorted(phases.items())]
+        lines += [
+            '# HELP portal_phase_seconds_total Time spent per phase by route',
+            '# TYPE portal_phase_seconds_total counter',
+        ]
+        lines += [f'portal_phase_seconds_total{{route="{_label(route)}",phase="{phase}"}} {seconds:.6f}'
+                  for (route, phase), (_, seconds) in sorted(phases.items())]
+        
+        lines += cls._render_caches(cls._cache_stats())
+        return '\n'.join(lines) + '\n'
+    
+    @classmethod
+    def _render_caches(cls, stats: Dict[str, Dict]) -> List[str]:
+        """Event counts as counters with a hit ratio, sizes and versions as gauges"""
+        counters: Dict[str, List[Tuple[str, float]]] = {}
+        gauges: Dict[str, List[Tuple[str, float]]] = {}
+        ratios: List[Tuple[str, float]] = []
+        for cache, values in stats.items():
+            for field, value in values.items():
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    continue
+                target = gauges if field in cls.CACHE_GAUGES else counters
+                target.setdefault(field, []).append((cache, value))
+            
+            # A hit from a second tier (the page cache's disk store) is still a hit
+            hits = sum(values.get(field, 0) for field in cls.CACHE_HITS)
+            lookups = hits + values.get('misses', 0)
+            if lookups:
+                ratios.append((cache, hits / lookups))
+        
+        lines = []
+        for field, values in sorted(counters.items()):
+            lines += [f'# HELP portal_cache_{field}_total Cache {field.replace("_", " ")} since start',
+                      f'# TYPE portal_cache_{field}_total counter']
+            lines += [f'portal_cache_{field}_total{{cache="{cache}"}} {value}' for cache, value in values]
+        lines += ['# HELP portal_cache_hit_ratio Hits (any tier) per lookup since start',
+                  '# TYPE portal_cache_hit_ratio gauge']
+        lines += [f'portal_cache_hit_ratio{{cache="{cache}"}} {ratio:.4f}' for cache, ratio in ratios]
+        for field, values in sorted(gauges.items()):
+            lines += [f'# TYPE portal_cache_{field} gauge']
+            lines += [f'portal_cache_{field}{{cache="{cache}"}} {value}' for cache, value in values]
+        return lines
\ No newline at end of file
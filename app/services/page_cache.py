@@ -0,0 +1,185 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from flask import request, make_response, Response
+from app.services.compression import CompressionService
+from app.services.config import ConfigService
+from app.services.data_version import DataVersionService
+from app.services.i18n import I18nService
+from app.services.schedule import ScheduleService
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class PageCache:
+    """Rendered public pages, per worker LRU plus an optional shared disk store"""
+    
+    ENABLED = os.getenv('PAGE_CACHE_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    MAX_ENTRIES = int(os.getenv('PAGE_CACHE_MAX_ENTRIES', '256'))
+    
+    # Directory shared by all workers; unset keeps the cache in memory only.
+    # It holds one file per page slot, overwritten when the page changes.
+    DISK_DIR = os.getenv('PAGE_CACHE_DIR')
+    
+    # key -> (expires_at, mimetype, body)
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+    _stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+    
+    @staticmethod
+    def make_key() -> Tuple[str, str, float]:
+        """Get (cache key, disk slot, expiry timestamp) for the current request
+
+        The slot names the page (endpoint, arguments, language); the key also
+        covers every version it was rendered from.
+        """
+        is_open, boundary = ScheduleService.get_state_bucket()
+        language = I18nService.get_current_language()
+        page = [
+            request.endpoint,
+            sorted(request.args.items(multi=True)),
+            language
+        ]
+        parts = page + [
+            I18nService.get_catalog_version(language),
+            DataVersionService.get_version(),
+            ConfigService.get_version(),
+            is_open,
+            boundary.isoformat()
+        ]
+        key = hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+        slot = hashlib.sha256(json.dumps(page).encode('utf-8')).hexdigest()
+        return key, slot, boundary.timestamp()
+    
+    @classmethod
+    def _disk_path(cls, slot: str) -> Path:
+        return Path(cls.DISK_DIR) / f'{slot}.page'
+    
+    @classmethod
+    def _read_disk(cls, key: str, slot: str) -> Optional[Tuple]:
+        """Read an entry written by any worker, if it is still the current one"""
+        try:
+            with open(cls._disk_path(slot), 'rb') as f:
+                header = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        
+        # An older version of the page stays until the next write replaces it
+        if header.get('key') != key or header['expires_at'] <= time.time():
+            return None
+        return header['expires_at'], header['mimetype'], body
+    
+    @classmethod
+    def _write_disk(cls, key: str, slot: str, entry: Tuple):
+        """Replace the slot's file atomically so readers never see partial files"""
+        expires_at, mimetype, body = entry
+        path = cls._disk_path(slot)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(json.dumps({'key': key, 'expires_at': expires_at, 'mimetype': mimetype}).encode('utf-8'))
+            f.write(b'\n')
+            f.write(body)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def get(cls, key: str, slot: str) -> Optional[Tuple]:
+        """Get a cached (expires_at, mimetype, body) entry"""
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry and entry[0] > time.time():
+                cls._entries.move_to_end(key)
+                cls._stats['hits'] += 1
+                return entry
+        
+        entry = cls._read_disk(key, slot) if cls.DISK_DIR else None
+        with cls._lock:
+            if entry:
+                cls._stats['disk_hits'] += 1
+                cls._remember(key, entry)
+            else:
+                cls._stats['misses'] += 1
+        return entry
+    
+    @classmethod
+    def _remember(cls, key: str, entry: Tuple):
+        """Add an entry to the in-memory LRU (lock must be held)"""
+        cls._entries[key] = entry
+        cls._entries.move_to_end(key)
+        while len(cls._entries) > cls.MAX_ENTRIES:
+            cls._entries.popitem(last=False)
+    
+    @classmethod
+    def set(cls, key: str, slot: str, entry: Tuple):
+        """Store a rendered page"""
+        with cls._lock:
+            cls._remember(key, entry)
+        if cls.DISK_DIR:
+            cls._write_disk(key, slot, entry)
+    
+    @classmethod
+    def clear(cls):
+        """Drop all in-memory entries of this worker"""
+        with cls._lock:
+            cls._entries.clear()
+    
+    @classmethod
+    def cache_stats(cls) -> Dict:
+        """Get hit/miss counters and the number of cached pages"""
+        with cls._lock:
+            return dict(cls._stats, entries=len(cls._entries))
+
+
+def _add_validators(response: Response, etag: str):
+    """Add ETag, Last-Modified and revalidation headers to a page response"""
+    response.set_etag(etag)
+    
+    # Newest of the last tracked data write and the config file change
+    last_modified = datetime.fromtimestamp(ConfigService.get_mtime(), timezone.utc)
+    updated_at = DataVersionService.get_updated_at()
+    if updated_at:
+        last_modified = max(last_modified, updated_at.replace(tzinfo=timezone.utc))
+    response.last_modified = last_modified
+    
+    # Pages change with the open state, so clients must revalidate each time
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    response.vary.update(('Accept-Language', 'Cookie'))
+
+
+def cached_page(view):
+    """Add validators to a public page and serve it from PageCache if enabled"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key, slot, expires_at = PageCache.make_key()
+        etag = key[:32]
+        
+        # The key covers everything the page depends on, so a matching
+        # ETag is answered before any query or template render
+        if CompressionService.etag_matches(etag):
+            response = Response(status=304)
+        else:
+            entry = PageCache.get(key, slot) if PageCache.ENABLED else None
+            if entry:
+                response = Response(entry[2], mimetype=entry[1])
+            else:
+                response = make_response(view(*args, **kwargs))
+                if PageCache.ENABLED and response.status_code == 200 \
+                        and not response.direct_passthrough:
+                    PageCache.set(key, slot, (expires_at, response.mimetype, response.get_data()))
+        
+        if response.status_code in (200, 304):
+            _add_validators(response, etag)
+        if response.status_code == 200:
+            # Compressed variants are stored once per page key
+            response.compression_key = f'page:{key}'
+        
+        return response
+    
+    return wrapper
\ No newline at end of file
@@ -1,54 +1,150 @@
 import qrcode
 from qrcode.image.svg import SvgPathImage
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import hashlib
 import io
 import os
+import threading
 from pathlib import Path
+from app.services.metrics import MetricsService
 
 
 class QRService:
     """Service for generating QR codes"""
     
+    ERROR_CORRECTION = {
+        'L': qrcode.constants.ERROR_CORRECT_L,
+        'M': qrcode.constants.ERROR_CORRECT_M,
+        'Q': qrcode.constants.ERROR_CORRECT_Q,
+        'H': qrcode.constants.ERROR_CORRECT_H,
+    }
+    
+    # Bounds of the in-process render cache
+    CACHE_MAX_ENTRIES = int(os.getenv('QR_CACHE_MAX_ENTRIES', '64'))
+    CACHE_MAX_BYTES = int(os.getenv('QR_CACHE_MAX_BYTES', str(4 * 1024 * 1024)))
+    
+    # Cache-Control max-age for QR responses
+    CACHE_MAX_AGE = int(os.getenv('QR_CACHE_MAX_AGE', '86400'))
+    
+    # (data, format, box size, error correction) -> (payload, etag)
+    _cache = OrderedDict()
+    _cache_bytes = 0
+    # ETags outlive evicted payloads so 304s never need a render
+    _etags = OrderedDict()
+    _lock = threading.Lock()
+    _stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    
     @staticmethod
-    def generate_qr_png(data: str, size: int = 10) -> bytes:
-        """Generate QR code as PNG bytes"""
+    def _make_qr(data: str, size: int, error_correction: str) -> qrcode.QRCode:
+        """Build and fit a QR code"""
         qr = qrcode.QRCode(
             version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            error_correction=QRService.ERROR_CORRECTION[error_correction],
             box_size=size,
             border=4,
         )
         qr.add_data(data)
         qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
+        return qr
+    
+    @staticmethod
+    def _render_png(data: str, size: int, error_correction: str) -> bytes:
+        """Render a QR code as PNG bytes"""
+        img = QRService._make_qr(data, size, error_correction).make_image(
+            fill_color="black", back_color="white"
+        )
         
         # Convert to bytes
         byte_io = io.BytesIO()
         img.save(byte_io, 'PNG')
-        byte_io.seek(0)
-        
         return byte_io.getvalue()
     
     @staticmethod
-    def generate_qr_svg(data: str) -> str:
-        """Generate QR code as SVG string"""
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
+    def _render_svg(data: str, size: int, error_correction: str) -> bytes:
+        """Render a QR code as SVG bytes"""
+        img = QRService._make_qr(data, size, error_correction).make_image(
+            image_factory=SvgPathImage
         )
-        qr.add_data(data)
-        qr.make(fit=True)
         
-        img = qr.make_image(image_factory=SvgPathImage)
-        
-        # Convert to string
+        # Convert to bytes
         byte_io = io.BytesIO()
         img.save(byte_io)
-        byte_io.seek(0)
+        return byte_io.getvalue()
+    
+    @classmethod
+    def _store(cls, key: Tuple, payload: bytes, etag: str):
+        """Add a rendered payload to the LRU cache, evicting as needed"""
+        with cls._lock:
+            cls._etags[key] = etag
+            cls._etags.move_to_end(key)
+            while len(cls._etags) > cls.CACHE_MAX_ENTRIES * 16:
+                cls._etags.popitem(last=False)
+            
+            if len(payload) > cls.CACHE_MAX_BYTES or key in cls._cache:
+                return
+            
+            cls._cache[key] = (payload, etag)
+            cls._cache_bytes += len(payload)
+            while len(cls._cache) > cls.CACHE_MAX_ENTRIES or cls._cache_bytes > cls.CACHE_MAX_BYTES:
+                _, (evicted, _) = cls._cache.popitem(last=False)
+                cls._cache_bytes -= len(evicted)
+                cls._stats['evictions'] += 1
+    
+    @classmethod
+    def render(cls, data: str, fmt: str = 'png', size: int = 10,
+               error_correction: str = 'L') -> Tuple[bytes, str]:
+        """Get a QR code as (payload, etag), rendering it only on a cache miss"""
+        key = (data, fmt, size, error_correction)
+        with cls._lock:
+            entry = cls._cache.get(key)
+            if entry:
+                cls._cache.move_to_end(key)
+                cls._stats['hits'] += 1
+                return entry
+            cls._stats['misses'] += 1
         
-        return byte_io.getvalue().decode('utf-8')
+        renderer = cls._render_svg if fmt == 'svg' else cls._render_png
+        with MetricsService.timer('qr'):
+            payload = renderer(data, size, error_correction)
+        etag = hashlib.sha256(payload).hexdigest()[:32]
+        cls._store(key, payload, etag)
+        return payload, etag
+    
+    @classmethod
+    def is_cached(cls, data: str, fmt: str = 'png', size: int = 10,
+                  error_correction: str = 'L') -> bool:
+        """Check whether render() would be served from the cache"""
+        with cls._lock:
+            return (data, fmt, size, error_correction) in cls._cache
+    
+    @staticmethod
+    def resolve_target(requested: Optional[str], url_root: str) -> str:
+        """Target URL of a QR request: ?target=, else SITE_URL, else the site root"""
+        return requested if requested is not None else os.getenv('SITE_URL', url_root)
+    
+    @classmethod
+    def get_etag(cls, data: str, fmt: str = 'png', size: int = 10,
+                 error_correction: str = 'L') -> Optional[str]:
+        """Get the ETag of an already rendered QR code without rendering it"""
+        with cls._lock:
+            return cls._etags.get((data, fmt, size, error_correction))
+    
+    @classmethod
+    def cache_stats(cls) -> Dict:
+        """Get hit/miss counters and current size of the render cache"""
+        with cls._lock:
+            return dict(cls._stats, entries=len(cls._cache), bytes=cls._cache_bytes)
+    
+    @classmethod
+    def generate_qr_png(cls, data: str, size: int = 10, error_correction: str = 'L') -> bytes:
+        """Generate QR code as PNG bytes"""
+        return cls.render(data, 'png', size, error_correction)[0]
+    
+    @classmethod
+    def generate_qr_svg(cls, data: str, size: int = 10, error_correction: str = 'L') -> str:
+        """Generate QR code as SVG string"""
+        return cls.render(data, 'svg', size, error_correction)[0].decode('utf-8')
     
     @staticmethod
     def save_qr_files(url: str, base_path: str = 'app/static/qr'):
@@ -68,6 +164,10 @@ class QRService:
         with open(svg_path, 'w', encoding='utf-8') as f:
             f.write(svg_data)
         
+        # Precompressed siblings for the static route (PNG is already deflated)
+        from app.services.compression import CompressionService
+        CompressionService.save_precompressed(svg_path)
+        
         return {
             'png': png_path,
             'svg': svg_path
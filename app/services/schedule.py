@@ -1,56 +1,175 @@
-from datetime import date, datetime, timedelta
-from typing import List, Dict, Optional
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, List, Dict, Optional, Tuple
 from sqlmodel import Session, select
 from app.models import StandardHours, HourException, Availability
-from app.database import engine
+from app.database import db_session, query_budget
+from app.services.data_version import DataVersionService
+from app.services.snapshot import SnapshotService
+import os
 import pytz
+import threading
 
 
 class ScheduleService:
     TIMEZONE = pytz.timezone('Asia/Bangkok')
     
+    # Exceptions kept in the process-local cache, relative to today
+    CACHE_PAST_DAYS = 62
+    CACHE_FUTURE_DAYS = 400
+    
+    # Days ahead covered by the open-interval index (including today)
+    HORIZON_DAYS = int(os.getenv('SCHEDULE_HORIZON_DAYS', '14'))
+    
+    _cache = None
+    _cache_lock = threading.Lock()
+    _index = None
+    _index_lock = threading.Lock()
+    
     @staticmethod
-    def get_hours_for_date(target_date: date) -> Dict:
-        """Get opening hours for a specific date"""
-        with Session(engine) as session:
-            # Check for exceptions first
-            exception = session.exec(
-                select(HourException).where(HourException.exception_date == target_date)
-            ).first()
-            
-            if exception:
-                return {
-                    'date': target_date,
-                    'closed': exception.closed,
-                    'time_ranges': exception.time_ranges,
-                    'note': exception.note,
-                    'is_exception': True
-                }
+    def _load_weekly(session: Session) -> Dict[int, List[str]]:
+        """Load the weekly template (at most 7 rows)"""
+        weekly = {}
+        for standard in session.exec(
+            select(StandardHours).order_by(StandardHours.id)
+        ).all():
+            weekly.setdefault(standard.day_of_week, list(standard.time_ranges))
+        return weekly
+    
+    @staticmethod
+    def _load_exceptions(session: Session, start_date: date, end_date: date) -> Dict[date, Dict]:
+        """Load all exceptions in [start_date, end_date] with one indexed query"""
+        exceptions = {}
+        rows = session.exec(
+            select(HourException).where(
+                HourException.exception_date >= start_date,
+                HourException.exception_date <= end_date
+            ).order_by(HourException.exception_date, HourException.id)
+        ).all()
+        for exception in rows:
+            # Keep the first exception per date, like .first() did
+            exceptions.setdefault(exception.exception_date, {
+                'closed': exception.closed,
+                'time_ranges': list(exception.time_ranges),
+                'note': exception.note
+            })
+        return exceptions
+    
+    @staticmethod
+    def _get_cache() -> Dict:
+        """Get the compiled weekly template and recent exceptions"""
+        version = DataVersionService.get_version()
+        today = datetime.now(ScheduleService.TIMEZONE).date()
+        
+        cache = ScheduleService._cache
+        if cache and cache['version'] == version and cache['today'] == today:
+            return cache
+        
+        with ScheduleService._cache_lock:
+            cache = ScheduleService._cache
+            if cache and cache['version'] == version and cache['today'] == today:
+                return cache
             
-            # Get standard hours for this day
-            day_of_week = target_date.weekday()
-            standard = session.exec(
-                select(StandardHours).where(StandardHours.day_of_week == day_of_week)
-            ).first()
+            # Shared snapshot first, so workers do not all query the database
+            cache = SnapshotService.get_schedule(version, today)
+            if cache:
+                ScheduleService._cache = cache
+                return cache
             
-            if standard:
-                return {
-                    'date': target_date,
-                    'closed': len(standard.time_ranges) == 0,
-                    'time_ranges': standard.time_ranges,
-                    'note': None,
-                    'is_exception': False
+            start = today - timedelta(days=ScheduleService.CACHE_PAST_DAYS)
+            end = today + timedelta(days=ScheduleService.CACHE_FUTURE_DAYS)
+            with db_session() as session:
+                cache = {
+                    'version': version,
+                    'today': today,
+                    'start': start,
+                    'end': end,
+                    'weekly': ScheduleService._load_weekly(session),
+                    'exceptions': ScheduleService._load_exceptions(session, start, end)
                 }
-            
+            ScheduleService._cache = cache
+            return cache
+    
+    @staticmethod
+    def _build_day(target_date: date, exception: Optional[Dict],
+                   time_ranges: Optional[List[str]]) -> Dict:
+        """Build the schedule dict for a single date"""
+        if exception:
+            return {
+                'date': target_date,
+                'closed': exception['closed'],
+                'time_ranges': list(exception['time_ranges']),
+                'note': exception['note'],
+                'is_exception': True
+            }
+        
+        if time_ranges is not None:
             return {
                 'date': target_date,
-                'closed': True,
-                'time_ranges': [],
+                'closed': len(time_ranges) == 0,
+                'time_ranges': list(time_ranges),
                 'note': None,
                 'is_exception': False
             }
+        
+        return {
+            'date': target_date,
+            'closed': True,
+            'time_ranges': [],
+            'note': None,
+            'is_exception': False
+        }
+    
+    @staticmethod
+    @query_budget(4)
+    def get_schedule_range(start_date: date, end_date: date) -> List[Dict]:
+        """Get schedule for every date in [start_date, end_date]"""
+        return list(ScheduleService.iter_schedule_range(start_date, end_date))
+    
+    @staticmethod
+    @query_budget(4)
+    def _get_range_data(start_date: date, end_date: date) -> Tuple[Dict[date, Dict], Dict[int, List[str]]]:
+        """Get (exceptions, weekly template) covering [start_date, end_date]"""
+        cache = ScheduleService._get_cache()
+        if cache['start'] <= start_date and end_date <= cache['end']:
+            return cache['exceptions'], cache['weekly']
+        
+        # Outside the cached window, fall back to one range query
+        with db_session() as session:
+            exceptions = ScheduleService._load_exceptions(session, start_date, end_date)
+        return exceptions, cache['weekly']
+    
+    @staticmethod
+    def iter_schedule_range(start_date: date, end_date: date) -> Iterator[Dict]:
+        """Yield the schedule day by day, with one exceptions lookup for the whole range"""
+        if end_date < start_date:
+            return
+        
+        # All queries happen here, in a plain call, so its budget can be checked
+        exceptions, weekly = ScheduleService._get_range_data(start_date, end_date)
+        current = start_date
+        while current <= end_date:
+            yield ScheduleService._build_day(
+                current,
+                exceptions.get(current),
+                weekly.get(current.weekday())
+            )
+            current += timedelta(days=1)
+    
+    @staticmethod
+    def get_weekly_template() -> Dict[int, List[str]]:
+        """Get standard time ranges per weekday (0=Monday)"""
+        weekly = ScheduleService._get_cache()['weekly']
+        return {day: list(weekly.get(day, [])) for day in range(7)}
     
     @staticmethod
+    @query_budget(4)
+    def get_hours_for_date(target_date: date) -> Dict:
+        """Get opening hours for a specific date"""
+        return ScheduleService.get_schedule_range(target_date, target_date)[0]
+    
+    @staticmethod
+    @query_budget(4)
     def get_week_schedule(start_date: Optional[date] = None) -> List[Dict]:
         """Get schedule for a week starting from given date"""
         if not start_date:
@@ -60,14 +179,12 @@ class ScheduleService:
         days_since_monday = start_date.weekday()
         week_start = start_date - timedelta(days=days_since_monday)
         
-        schedule = []
-        for i in range(7):
-            day = week_start + timedelta(days=i)
-            schedule.append(ScheduleService.get_hours_for_date(day))
-        
-        return schedule
+        return ScheduleService.get_schedule_range(
+            week_start, week_start + timedelta(days=6)
+        )
     
     @staticmethod
+    @query_budget(4)
     def get_month_schedule(year: int, month: int) -> List[Dict]:
         """Get schedule for entire month"""
         first_day = date(year, month, 1)
@@ -78,68 +195,163 @@ class ScheduleService:
         else:
             last_day = date(year, month + 1, 1) - timedelta(days=1)
         
-        schedule = []
-        current = first_day
-        while current <= last_day:
-            schedule.append(ScheduleService.get_hours_for_date(current))
-            current += timedelta(days=1)
-        
-        return schedule
+        return ScheduleService.get_schedule_range(first_day, last_day)
     
     @staticmethod
     def get_availability_for_date(target_date: date) -> Optional[Availability]:
         """Get availability slots for a specific date"""
-        with Session(engine) as session:
+        with db_session() as session:
             return session.exec(
                 select(Availability).where(Availability.availability_date == target_date)
             ).first()
     
     @staticmethod
-    def is_open_now() -> bool:
-        """Check if currently open"""
-        now = datetime.now(ScheduleService.TIMEZONE)
-        today_hours = ScheduleService.get_hours_for_date(now.date())
+    def time_range_to_minutes(time_range: str) -> Tuple[int, int]:
+        """Parse 'HH:MM-HH:MM' into minute offsets from midnight"""
+        start, end = time_range.split('-')
+        start_h, start_m = start.strip().split(':')
+        end_h, end_m = end.strip().split(':')
+        return int(start_h) * 60 + int(start_m), int(end_h) * 60 + int(end_m)
+    
+    @staticmethod
+    def _build_intervals(schedule: List[Dict]) -> List[Tuple]:
+        """Turn schedule days into (start, end, date, time_range) tuples"""
+        intervals = []
+        for day in schedule:
+            if day['closed']:
+                continue
+            
+            midnight = ScheduleService.TIMEZONE.localize(
+                datetime.combine(day['date'], time())
+            )
+            for time_range in day['time_ranges']:
+                start, end = ScheduleService.time_range_to_minutes(time_range)
+                intervals.append((
+                    midnight + timedelta(minutes=start),
+                    midnight + timedelta(minutes=end),
+                    day['date'],
+                    time_range
+                ))
+        return intervals
+    
+    @staticmethod
+    def _make_index(version: int, first_day: date, last_day: date, intervals: List[Tuple]) -> Dict:
+        """Sort intervals and precompute the bisect keys"""
+        intervals.sort(key=lambda interval: interval[0])
+        
+        # Running maximum of end times, so overlapping ranges stay correct
+        max_ends = []
+        max_end = None
+        for interval in intervals:
+            if max_end is None or interval[1] > max_end:
+                max_end = interval[1]
+            max_ends.append(max_end)
         
-        if today_hours['closed']:
-            return False
+        return {
+            'version': version,
+            'first_day': first_day,
+            'last_day': last_day,
+            'intervals': intervals,
+            'starts': [interval[0] for interval in intervals],
+            'max_ends': max_ends
+        }
+    
+    @staticmethod
+    def _get_interval_index(today: date) -> Dict:
+        """Get the open-interval index for [today, today + HORIZON_DAYS)"""
+        version = DataVersionService.get_version()
+        last_day = today + timedelta(days=ScheduleService.HORIZON_DAYS - 1)
         
-        current_time = now.strftime('%H:%M')
-        for time_range in today_hours['time_ranges']:
-            start, end = time_range.split('-')
-            if start <= current_time <= end:
-                return True
+        index = ScheduleService._index
+        if index and index['version'] == version and index['first_day'] == today \
+                and index['last_day'] == last_day:
+            return index
         
-        return False
+        with ScheduleService._index_lock:
+            index = ScheduleService._index
+            if index and index['version'] == version and index['first_day'] == today \
+                    and index['last_day'] == last_day:
+                return index
+            
+            if index and index['version'] == version \
+                    and index['first_day'] < today <= index['last_day'] + timedelta(days=1):
+                # Day rolled over: drop past days and only resolve the new ones
+                intervals = [i for i in index['intervals'] if i[2] >= today]
+                new_days = ScheduleService.get_schedule_range(
+                    max(index['last_day'] + timedelta(days=1), today), last_day
+                )
+                intervals.extend(ScheduleService._build_intervals(new_days))
+            else:
+                # Schedule data changed: rebuild from the cached range
+                intervals = ScheduleService._build_intervals(
+                    ScheduleService.get_schedule_range(today, last_day)
+                )
+            
+            index = ScheduleService._make_index(version, today, last_day, intervals)
+            ScheduleService._index = index
+            return index
+    
+    @staticmethod
+    @query_budget(3)
+    def is_open_now() -> bool:
+        """Check if currently open"""
+        return ScheduleService.get_state_bucket()[0]
     
     @staticmethod
+    @query_budget(3)
     def get_next_open_time() -> Optional[Dict]:
         """Get next opening time"""
-        now = datetime.now(ScheduleService.TIMEZONE)
-        current_date = now.date()
+        now = datetime.now(ScheduleService.TIMEZONE).replace(second=0, microsecond=0)
+        index = ScheduleService._get_interval_index(now.date())
         
-        # Check up to 14 days ahead
-        for i in range(14):
-            check_date = current_date + timedelta(days=i)
-            hours = ScheduleService.get_hours_for_date(check_date)
-            
-            if not hours['closed'] and hours['time_ranges']:
-                # If today, check if any time range is still ahead
-                if i == 0:
-                    current_time = now.strftime('%H:%M')
-                    for time_range in hours['time_ranges']:
-                        start, _ = time_range.split('-')
-                        if start > current_time:
-                            return {
-                                'date': check_date,
-                                'time': start,
-                                'time_range': time_range
-                            }
-                else:
-                    # Future date, return first time range
-                    return {
-                        'date': check_date,
-                        'time': hours['time_ranges'][0].split('-')[0],
-                        'time_range': hours['time_ranges'][0]
-                    }
-        
-        return None
\ No newline at end of file
+        # First interval starting after now, within the horizon
+        position = bisect_right(index['starts'], now)
+        if position == len(index['intervals']):
+            return None
+        
+        _, _, open_date, time_range = index['intervals'][position]
+        return {
+            'date': open_date,
+            'time': time_range.split('-')[0],
+            'time_range': time_range
+        }
+    
+    @staticmethod
+    @query_budget(3)
+    def get_state() -> Tuple[bool, Optional[datetime]]:
+        """Get (is open now, time of the next open/close change within the horizon)"""
+        now = datetime.now(ScheduleService.TIMEZONE).replace(second=0, microsecond=0)
+        index = ScheduleService._get_interval_index(now.date())
+        
+        # Last interval starting at or before now
+        position = bisect_right(index['starts'], now) - 1
+        is_open = position >= 0 and index['max_ends'][position] >= now
+        if not is_open:
+            next_position = position + 1
+            return is_open, index['starts'][next_position] if next_position < len(index['starts']) else None
+        
+        # Ranges include their end minute, so we close one minute later,
+        # unless another range starts by then (e.g. 23:59 into 00:00)
+        boundary = index['max_ends'][position] + timedelta(minutes=1)
+        while True:
+            position = bisect_right(index['starts'], boundary) - 1
+            closes = index['max_ends'][position] + timedelta(minutes=1)
+            if closes <= boundary:
+                return is_open, boundary
+            boundary = closes
+    
+    @staticmethod
+    @query_budget(3)
+    def get_state_bucket() -> Tuple[bool, datetime]:
+        """Get (is open now, time of the next open/close change or midnight)"""
+        now = datetime.now(ScheduleService.TIMEZONE).replace(second=0, microsecond=0)
+        is_open, boundary = ScheduleService.get_state()
+        
+        # The date shown on every page changes at midnight too
+        midnight = ScheduleService.TIMEZONE.localize(
+            datetime.combine(now.date() + timedelta(days=1), time())
+        )
+        if boundary is None or boundary > midnight:
+            boundary = midnight
+        
+        return is_open, boundary
@@ -0,0 +1,250 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.engine import make_url
+from sqlmodel import Session
+from app.database import DATABASE_URL, engine
+import json
+import mmap
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def _default_path() -> Optional[str]:
+    """Keep the snapshot next to a SQLite file so each database has its own"""
+    url = make_url(DATABASE_URL)
+    if url.get_backend_name() != 'sqlite':
+        return os.path.join('data', 'snapshot.bin')
+    if not url.database or url.database == ':memory:':
+        return None
+    return os.path.splitext(url.database)[0] + '.snapshot'
+
+
+class SnapshotService:
+    """Read-mostly data shared by all workers through one file
+
+    Layout: a JSON header line (data version, day, section offsets) followed
+    by one JSON document per section. It saves each worker the queries and
+    the YAML parsing, not memory: a section is copied out of the map and
+    decoded into the worker's own objects once per version. The map only
+    keeps the file as it was when it was opened, even if it is replaced.
+    
+    Only writers publish: the commit that bumps the data version, the
+    gunicorn master on start and `flask publish-snapshot`. Requests only
+    read, and fall back to the database while the file is out of date.
+    """
+    
+    ENABLED = os.getenv('SNAPSHOT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    PATH = os.getenv('SNAPSHOT_PATH') or _default_path()
+    FORMAT = 1
+    
+    _mmap = None
+    _header = None
+    _body_start = 0
+    _stat = None
+    # Decoded sections of the currently mapped file
+    _sections = {}
+    _lock = threading.Lock()
+    _stats = {'publishes': 0, 'maps': 0, 'section_reads': 0}
+    
+    @classmethod
+    def _open(cls) -> Optional[Dict]:
+        """Map the snapshot file if it was replaced since the last call"""
+        try:
+            stat = os.stat(cls.PATH)
+        except OSError:
+            return None
+        
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with cls._lock:
+            if signature == cls._stat:
+                return cls._header
+            
+            try:
+                with open(cls.PATH, 'rb') as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                header_end = mapped.find(b'\n')
+                header = json.loads(mapped[:header_end])
+            except (OSError, ValueError):
+                return None
+            if header.get('format') != cls.FORMAT:
+                return None
+            
+            # Readers still slicing the old map keep it alive until they finish
+            cls._mmap = mapped
+            cls._header = header
+            cls._body_start = header_end + 1
+            cls._stat = signature
+            cls._sections = {}
+            cls._stats['maps'] += 1
+            return header
+    
+    @classmethod
+    def _section(cls, name: str):
+        """Decode one section of the mapped file (a copy, cached until the next map)"""
+        with cls._lock:
+            if name in cls._sections:
+                return cls._sections[name]
+            offset, length = cls._header['sections'][name]
+            start = cls._body_start + offset
+            value = json.loads(cls._mmap[start:start + length])
+            cls._sections[name] = value
+            cls._stats['section_reads'] += 1
+            return value
+    
+    @classmethod
+    def _current(cls, version: int) -> Optional[Dict]:
+        """Header of the snapshot if it was written for this data version"""
+        if not cls.ENABLED or not cls.PATH:
+            return None
+        
+        header = cls._open()
+        if header is None or header['data_version'] != version:
+            return None
+        return header
+    
+    @classmethod
+    def get_schedule(cls, version: int, today: date) -> Optional[Dict]:
+        """Schedule cache for ScheduleService, or None if the snapshot is not current"""
+        if cls._current(version) is None:
+            return None
+        
+        # Written on an earlier day the window is shifted, but still valid:
+        # callers check the range and query outside of it
+        schedule = cls._section('schedule')
+        start = date.fromisoformat(schedule['start'])
+        end = date.fromisoformat(schedule['end'])
+        if not start <= today <= end:
+            return None
+        return {
+            'version': version,
+            'today': today,
+            'start': start,
+            'end': end,
+            'weekly': {int(day): ranges for day, ranges in schedule['weekly'].items()},
+            'exceptions': {date.fromisoformat(day): exception
+                           for day, exception in schedule['exceptions'].items()}
+        }
+    
+    @classmethod
+    def get_status(cls, version: int) -> Tuple[bool, Optional[Dict]]:
+        """(found, fields of the latest status row) for StatusService"""
+        if cls._current(version) is None:
+            return False, None
+        return True, cls._section('status')
+    
+    @classmethod
+    def get_config(cls, signature: Tuple[int, int]) -> Optional[Tuple[str, Dict]]:
+        """(version, config) if the snapshot was built from this config file"""
+        if not cls.ENABLED or not cls.PATH or cls._open() is None:
+            return None
+        
+        config = cls._section('config')
+        if tuple(config['signature']) != tuple(signature):
+            return None
+        return config['version'], config['config']
+    
+    @classmethod
+    def publish(cls) -> bool:
+        """Rewrite the snapshot from the database; False if it cannot be written
+
+        Waits for a concurrent publish, then skips the write if that one
+        already covers the current version.
+        """
+        if not cls.ENABLED or not cls.PATH:
+            return False
+        try:
+            return cls._publish()
+        except OSError:
+            # Readers fall back to the database until the next publish
+            return False
+    
+    @classmethod
+    def _publish(cls) -> bool:        
+        from app.models import Settings
+        from app.services.config import ConfigService
+        from app.services.data_version import DataVersionService
+        from app.services.schedule import ScheduleService
+        from app.services.status import StatusService
+        
+        os.makedirs(os.path.dirname(cls.PATH) or '.', exist_ok=True)
+        with open(cls.PATH + '.lock', 'a') as lock_file:
+            if fcntl:
+                # Blocking: a writer that skipped here could leave an older version behind
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            
+            today = datetime.now(ScheduleService.TIMEZONE).date()
+            start = today - timedelta(days=ScheduleService.CACHE_PAST_DAYS)
+            end = today + timedelta(days=ScheduleService.CACHE_FUTURE_DAYS)
+            
+            # One transaction, so version and data belong together
+            with Session(engine) as session:
+                row = session.get(Settings, DataVersionService.SETTINGS_KEY)
+                version = row.value.get('version', 0) if row else 0
+                
+                header = cls._open()
+                if (header and header['data_version'] == version and header['today'] == today.isoformat()
+                        and header['config_version'] == ConfigService.get_version()):
+                    # Written by another process while we waited
+                    return True
+                
+                status = StatusService._load_latest(session)
+                sections = {
+                    'schedule': {
+                        'start': start.isoformat(),
+                        'end': end.isoformat(),
+                        'weekly': ScheduleService._load_weekly(session),
+                        'exceptions': {day.isoformat(): exception for day, exception
+                                       in ScheduleService._load_exceptions(session, start, end).items()}
+                    },
+                    'status': status.model_dump(mode='json') if status else None,
+                }
+            
+            sections['config'] = {
+                'signature': ConfigService.get_signature(),
+                'version': ConfigService.get_version(),
+                'config': ConfigService.to_dict()
+            }
+            cls._write(version, today, ConfigService.get_version(), sections)
+            return True
+    
+    @classmethod
+    def _write(cls, version: int, today: date, config_version: str, sections: Dict):
+        """Write header and sections to a temporary file and swap it in"""
+        offsets = {}
+        chunks: List[bytes] = []
+        position = 0
+        for name, value in sections.items():
+            chunk = json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str).encode('utf-8')
+            offsets[name] = [position, len(chunk)]
+            chunks.append(chunk)
+            position += len(chunk)
+        
+        header = json.dumps({
+            'format': cls.FORMAT,
+            'data_version': version,
+            'today': today.isoformat(),
+            'config_version': config_version,
+            'written_at': datetime.utcnow().isoformat(),
+            'sections': offsets
+        }).encode('utf-8')
+        
+        tmp_path = f'{cls.PATH}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(header + b'\n')
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, cls.PATH)
+        cls._stats['publishes'] += 1
+    
+    @classmethod
+    def cache_stats(cls) -> Dict:
+        """Get publish/map counters and the mapped snapshot's version"""
+        with cls._lock:
+            header = cls._header or {}
+            return dict(cls._stats, data_version=header.get('data_version'),
+                        bytes=cls._stat[2] if cls._stat else 0)
\ No newline at end of file
@@ -1,35 +1,90 @@
 from datetime import date, datetime
 from typing import Optional
 from sqlmodel import Session, select
-from app.models import Status, StatusType
-from app.database import engine
+from app.models import Status, StatusType, Settings
+from app.database import db_session, query_budget
+from app.services.data_version import DataVersionService
+from app.services.snapshot import SnapshotService
 
 
 class StatusService:
+    # Settings key pointing at the id of the latest status row
+    CURRENT_KEY = 'current_status'
+    
+    # Column values of the latest status row, keyed by data version
+    _cache = None
+    
+    @staticmethod
+    def _load_latest(session: Session) -> Optional[Status]:
+        """Load the latest status row via the pointer or the created_at index"""
+        pointer = session.get(Settings, StatusService.CURRENT_KEY)
+        if pointer and pointer.value.get('id') is not None:
+            status = session.get(Status, pointer.value['id'])
+            if status:
+                return status
+        
+        # Databases written before the pointer existed
+        return session.exec(
+            select(Status).order_by(Status.created_at.desc(), Status.id.desc()).limit(1)
+        ).first()
+    
+    @staticmethod
+    def _set_pointer(session: Session, status: Status):
+        """Point the current status at a freshly flushed row"""
+        pointer = session.get(Settings, StatusService.CURRENT_KEY)
+        if pointer is None:
+            pointer = Settings(key=StatusService.CURRENT_KEY)
+            session.add(pointer)
+        pointer.value = {'id': status.id}
+        pointer.updated_at = datetime.utcnow()
+    
+    @staticmethod
+    def _is_expired(status: Status) -> bool:
+        """Check if a status has run past its end date"""
+        return bool(status.date_to and status.date_to < date.today())
+    
     @staticmethod
+    @query_budget(4)
     def get_current_status() -> Optional[Status]:
-        """Get the current active status"""
-        with Session(engine) as session:
-            # Get latest status
-            statement = select(Status).order_by(Status.created_at.desc())
-            status = session.exec(statement).first()
-            
-            if not status:
-                # Create default status if none exists
-                status = Status(type=StatusType.ANWESEND)
-                session.add(status)
-                session.commit()
-                session.refresh(status)
-            
-            # Check if status is still valid
-            today = date.today()
-            if status.date_to and status.date_to < today:
-                # Status expired, set to present
-                status = Status(type=StatusType.ANWESEND)
-                session.add(status)
-                session.commit()
-                session.refresh(status)
+        """Get the current active status without writing anything"""
+        version = DataVersionService.get_version()
+        cache = StatusService._cache
+        if not cache or cache['version'] != version:
+            found, fields = SnapshotService.get_status(version)
+            if found:
+                status = Status.model_validate(fields) if fields else None
+            else:
+                with db_session() as session:
+                    status = StatusService._load_latest(session)
+            cache = {
+                'version': version,
+                'fields': status.model_dump() if status else None
+            }
+            StatusService._cache = cache
+        
+        status = Status(**cache['fields']) if cache['fields'] else None
+        
+        # No status yet, or it has expired: the lab is present again.
+        # expire_stale_status() persists the transition once.
+        if status is None or StatusService._is_expired(status):
+            return Status(type=StatusType.ANWESEND)
+        
+        return status
+    
+    @staticmethod
+    def expire_stale_status() -> Optional[Status]:
+        """Persist the switch back to ANWESEND once the latest status expired"""
+        with db_session() as session:
+            status = StatusService._load_latest(session)
+            if status and not StatusService._is_expired(status):
+                return None
             
+            status = Status(type=StatusType.ANWESEND)
+            session.add(status)
+            session.flush()
+            StatusService._set_pointer(session, status)
+            session.commit()
+            session.refresh(status)
             return status
     
     @staticmethod
@@ -41,7 +96,7 @@ class StatusService:
         next_return: Optional[date] = None
     ) -> Status:
         """Update the current status"""
-        with Session(engine) as session:
+        with db_session() as session:
             status = Status(
                 type=status_type,
                 date_from=date_from,
@@ -51,6 +106,8 @@ class StatusService:
                 updated_at=datetime.utcnow()
             )
             session.add(status)
+            session.flush()
+            StatusService._set_pointer(session, status)
             session.commit()
             session.refresh(status)
             return status
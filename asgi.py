@@ -0,0 +1,5 @@
+#!/usr/bin/env python3
+"""ASGI entry point: uvicorn asgi:app --host 0.0.0.0 --port 5000"""
+from app.asgi import create_asgi_app
+
+app = create_asgi_app()
\ No newline at end of file
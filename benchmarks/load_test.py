@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Drive the WSGI app from many concurrent clients and report latency per route
+
+    python -m benchmarks.load_test --clients 16 --requests 500 --out results.json
+    python -m benchmarks.load_test --compare results.json
+
+Each client is a thread with its own test client calling the WSGI app
+directly, so the numbers cover Flask, the services and the database but not
+a network server. Results are JSON: throughput and p50/p95/p99 per route,
+plus the commit and settings they were measured with.
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.seed import DEFAULTS, add_anchor_argument, seed, use_database
+
+ROUTES = ['/', '/week', '/month', '/qr', '/qr.svg', '/api/v1/schedule', '/calendar.ics']
+
+DEFAULT_ROUTES = ['/', '/week', '/month', '/qr', '/qr.svg']
+
+LANGUAGES = ['th', 'de', 'en']
+
+
+def scenarios(today: date) -> dict:
+    """Route label -> URLs cycled through by the clients, relative to the seeded today
+
+    The app renders relative to the current date, so the pages measured must
+    be the ones the seeded exceptions fall on.
+    """
+    def month(offset: int) -> str:
+        index = today.year * 12 + today.month - 1 + offset
+        return f'/month?year={index // 12}&month={index % 12 + 1}'
+    
+    return {
+        '/': ['/'],
+        '/week': ['/week', '/week?offset=1', '/week?offset=-1', '/week?offset=4'],
+        '/month': ['/month', month(1), month(6)],
+        '/qr': ['/qr', '/qr?target=https://example.com/a', '/qr?target=https://example.com/b'],
+        '/qr.svg': ['/qr.svg'],
+        '/api/v1/schedule': [f'/api/v1/schedule?from={today}&to={today + timedelta(days=364)}'],
+        '/calendar.ics': ['/calendar.ics'],
+    }
+
+
+def percentile(samples, fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    if not samples:
+        return 0.0
+    index = max(0, min(len(samples) - 1, math.ceil(fraction * len(samples)) - 1))
+    return samples[index]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_route(app, urls: list, clients: int, requests_per_client: int, warmup: int) -> dict:
+    """Hammer one route from concurrent clients"""
+    latencies = []
+    errors = []
+    # Per-client first start and last end: the timed span excludes thread start-up and warmup
+    spans = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients)
+    
+    def client(number: int):
+        test_client = app.test_client()
+        headers = {'Accept-Language': LANGUAGES[number % len(LANGUAGES)], 'Accept-Encoding': 'gzip'}
+        cycle = itertools.cycle(urls[number % len(urls):] + urls[:number % len(urls)])
+        for _ in range(warmup):
+            test_client.get(next(cycle), headers=headers)
+        
+        local = []
+        local_errors = 0
+        barrier.wait()
+        first = time.perf_counter()
+        for _ in range(requests_per_client):
+            started = time.perf_counter()
+            response = test_client.get(next(cycle), headers=headers)
+            response.get_data()
+            local.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                local_errors += 1
+        last = time.perf_counter()
+        with lock:
+            latencies.extend(local)
+            errors.append(local_errors)
+            spans.append((first, last))
+    
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = max(end for _, end in spans) - min(start for start, _ in spans) if spans else 0.0
+    
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+
+def compare(current: dict, baseline: dict) -> str:
+    """Table of p50/p95/p99 and throughput changes against a previous run"""
+    lines = [f"{'route':<20} {'metric':<15} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for route, stats in current['routes'].items():
+        old = baseline.get('routes', {}).get(route)
+        if not old:
+            continue
+        for metric in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+            change = (stats[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+            lines.append(f"{route:<20} {metric:<15} {old[metric]:>10} {stats[metric]:>10} {change:>+7.1f}%")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent WSGI load test per route')
+    parser.add_argument('--db', default='data/bench.db', help='benchmark SQLite file (default: data/bench.db)')
+    parser.add_argument('--no-seed', action='store_true', help='reuse the database as it is')
+    parser.add_argument('--seed', type=int, default=DEFAULTS['seed'], help='random seed for the dataset')
+    # The app renders relative to the real date, so the data must be seeded around it
+    add_anchor_argument(parser, default=None, shown='the current date in the portal time zone')
+    parser.add_argument('--routes', nargs='+', default=DEFAULT_ROUTES,
+                        help=f"routes to test (known: {', '.join(ROUTES)})")
+    parser.add_argument('--clients', type=int, default=16, help='concurrent clients (default: 16)')
+    parser.add_argument('--requests', type=int, default=200, help='requests per client and route')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed requests per client first')
+    parser.add_argument('--out', help='write the JSON result to this file (default: stdout)')
+    parser.add_argument('--compare', help='previous JSON result to compare against')
+    args = parser.parse_args()
+    
+    use_database(args.db)
+    # Deterministic QR targets, independent of the machine's .env
+    os.environ.setdefault('SITE_URL', 'http://localhost:5000')
+    
+    from app.services.schedule import ScheduleService
+    today = args.anchor or datetime.now(ScheduleService.TIMEZONE).date()
+    dataset = None if args.no_seed else seed(seed=args.seed, anchor=today)
+    
+    from app import create_app
+    app = create_app()
+    urls = scenarios(today)
+    
+    result = {
+        'commit': _git_commit(),
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {
+            'clients': args.clients,
+            'requests_per_client': args.requests,
+            'warmup': args.warmup,
+            'seed': args.seed,
+            'anchor': today.isoformat(),
+            'dataset': dataset,
+            'page_cache': os.getenv('PAGE_CACHE_ENABLED', 'false'),
+        },
+        'routes': {},
+    }
+    for route in args.routes:
+        result['routes'][route] = run_route(app, urls.get(route, [route]), args.clients, args.requests,
+                                            args.warmup)
+        stats = result['routes'][route]
+        print(f"{route:<20} {stats['throughput_rps']:>8} req/s  p50 {stats['p50_ms']:>8} ms  "
+              f"p95 {stats['p95_ms']:>8} ms  p99 {stats['p99_ms']:>8} ms  errors {stats['errors']}",
+              file=sys.stderr)
+    
+    output = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print(compare(result, json.load(f)), file=sys.stderr)
+    
+    errors = sum(stats['errors'] for stats in result['routes'].values())
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
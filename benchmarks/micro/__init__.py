@@ -0,0 +1,74 @@
+"""Micro-benchmarks for the services, with stored baselines
+
+Each app/services/<name>.py has its benchmarks in bench_<name>.py here. A
+benchmark is a factory: it gets one parameter (an input size), does its
+setup and returns the zero-argument callable that is timed:
+
+    @benchmark(params=[1, 31, 366])
+    def schedule_range(days):
+        start = date.today()
+        return lambda: ScheduleService.get_schedule_range(start, start + timedelta(days=days - 1))
+
+Run with python -m benchmarks.micro (see --help).
+"""
+
+import gc
+import importlib
+import pkgutil
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+
+class Benchmark(NamedTuple):
+    name: str
+    factory: Callable
+    params: Sequence
+    threshold: Optional[float]
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(params: Sequence = (None,), name: Optional[str] = None, threshold: Optional[float] = None):
+    """Register a benchmark factory; threshold overrides the allowed slowdown"""
+    def register(factory: Callable) -> Callable:
+        module = factory.__module__.rsplit('.', 1)[-1].replace('bench_', '', 1)
+        BENCHMARKS.append(Benchmark(name or f'{module}.{factory.__name__}', factory, params, threshold))
+        return factory
+    return register
+
+
+def discover() -> List[Benchmark]:
+    """Import every bench_*.py module in this package"""
+    for module in pkgutil.iter_modules(__path__):
+        if module.name.startswith('bench_'):
+            importlib.import_module(f'{__name__}.{module.name}')
+    return BENCHMARKS
+
+
+def measure(func: Callable[[], object], repeat: int = 5, min_time: float = 0.05) -> Dict:
+    """Seconds per call: best of `repeat` runs, each at least min_time long"""
+    def run(loops: int) -> float:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        return time.perf_counter() - started
+    
+    # Like timeit: no collections in the middle of a run
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        # Calibrate the loop count like timeit's autorange
+        loops = 1
+        while True:
+            elapsed = run(loops)
+            if elapsed >= min_time:
+                break
+            loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+        
+        timings = [elapsed / loops] + [run(loops) / loops for _ in range(repeat - 1)]
+    finally:
+        if gc_enabled:
+            gc.enable()
+    
+    return {'best': min(timings), 'median': sorted(timings)[len(timings) // 2], 'loops': loops}
\ No newline at end of file
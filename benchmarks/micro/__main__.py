@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Run the micro-benchmarks and compare them against a stored baseline
+
+    python -m benchmarks.micro --update-baseline     # on the reference commit
+    python -m benchmarks.micro                       # fails on a regression
+    python -m benchmarks.micro --filter qr --threshold 0.5
+    python -m benchmarks.micro --require-baseline    # also fails without a baseline
+
+Runs offline against a small seeded SQLite file. A benchmark regresses when
+its best time per call is more than --threshold slower than the baseline's.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+from benchmarks.load_test import _git_commit
+from benchmarks.micro import discover, measure
+from benchmarks.seed import add_anchor_argument, seed, use_database
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Enough history for the out-of-window queries, small enough to seed quickly
+DATASET = {'years': 3, 'statuses': 1000, 'announcements': 50}
+
+
+def _format_time(seconds: float) -> str:
+    for unit, factor in (('s', 1), ('ms', 1e3), ('us', 1e6)):
+        if seconds * factor >= 1:
+            return f'{seconds * factor:.2f} {unit}'
+    return f'{seconds * 1e9:.0f} ns'
+
+
+def _machine() -> dict:
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks of the hot service functions')
+    parser.add_argument('--db', default='data/micro.db', help='benchmark SQLite file (default: data/micro.db)')
+    parser.add_argument('--no-seed', action='store_true', help='reuse the database as it is')
+    add_anchor_argument(parser)
+    parser.add_argument('--filter', nargs='+', default=[], help='only benchmarks whose name contains one of these')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='store the results as the new baseline instead of comparing')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown against the baseline (default: 0.25 = 25%%)')
+    parser.add_argument('--repeat', type=int, default=7, help='timed runs per benchmark (best is kept)')
+    parser.add_argument('--min-time', type=float, default=0.05, help='minimum seconds per timed run')
+    parser.add_argument('--out', help='also write the results as JSON to this file')
+    parser.add_argument('--require-baseline', action='store_true',
+                        help='fail when a benchmark has no baseline entry (for CI jobs that restore one)')
+    args = parser.parse_args()
+    
+    use_database(args.db)
+    if not args.no_seed:
+        seed(**DATASET, anchor=args.anchor)
+    
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    if not args.update_baseline:
+        if not baseline:
+            print(f'warning: no baseline at {args.baseline}, run with --update-baseline on the reference commit',
+                  file=sys.stderr)
+        elif baseline.get('machine') != _machine():
+            print(f"warning: baseline was measured on {baseline.get('machine')}, timings may not compare",
+                  file=sys.stderr)
+    
+    results = {}
+    regressions = []
+    missing = []
+    for bench in discover():
+        if args.filter and not any(word in bench.name for word in args.filter):
+            continue
+        for param in bench.params:
+            name = bench.name if param is None else f'{bench.name}[{param}]'
+            func = bench.factory(param)
+            # One untimed call fills the caches the benchmark relies on
+            func()
+            stats = measure(func, args.repeat, args.min_time)
+            results[name] = stats
+            
+            line = f"{name:<45} {_format_time(stats['best']):>12}"
+            old = baseline.get('benchmarks', {}).get(name)
+            if old and not args.update_baseline:
+                change = stats['best'] / old['best'] - 1
+                threshold = bench.threshold if bench.threshold is not None else args.threshold
+                if change > threshold:
+                    # Confirm with a second measurement before blaming the change
+                    retry = measure(func, args.repeat, args.min_time)
+                    if retry['best'] < stats['best']:
+                        stats = results[name] = retry
+                        change = stats['best'] / old['best'] - 1
+                line += f"  {change:>+7.1%} vs {_format_time(old['best'])}"
+                if change > threshold:
+                    line += f'  REGRESSION (> {threshold:.0%})'
+                    regressions.append(name)
+            elif not args.update_baseline:
+                line += '  (no baseline)'
+                missing.append(name)
+            print(line, file=sys.stderr)
+    
+    run = {
+        'commit': _git_commit(),
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'machine': _machine(),
+        'benchmarks': results,
+    }
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(run, indent=2) + '\n')
+    
+    if args.update_baseline:
+        # Merge, so a filtered run only replaces its own entries
+        if baseline.get('machine') == run['machine']:
+            run['benchmarks'] = dict(baseline.get('benchmarks', {}), **results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(run, indent=2, sort_keys=True) + '\n')
+        print(f'Baseline written to {args.baseline}', file=sys.stderr)
+        return 0
+    
+    failed = False
+    if missing:
+        # Without a baseline nothing was compared; only a CI run treats that as failure
+        print(f"{len(missing)} benchmark(s) without baseline: {', '.join(missing)}", file=sys.stderr)
+        failed = args.require_baseline
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
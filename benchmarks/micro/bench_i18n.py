@@ -0,0 +1,30 @@
+"""I18nService: lookups per page, with and without parameters"""
+
+from benchmarks.micro import benchmark
+
+
+@benchmark(params=[1, 50, 500])
+def translate(keys):
+    from app.services import I18nService
+    catalog = I18nService.get_catalog('de')
+    plain = sorted(key for key in catalog.messages if key not in catalog.templates)
+    keys = [plain[i % len(plain)] for i in range(keys)]
+    
+    def run():
+        for key in keys:
+            I18nService.translate(key, 'de')
+    return run
+
+
+@benchmark(params=[1, 50, 500])
+def translate_with_params(keys):
+    from app.services import I18nService
+    catalog = I18nService.get_catalog('de')
+    # Parameterised messages if there are any, otherwise the kwargs path on plain ones
+    templated = sorted(catalog.templates) or sorted(catalog.messages)
+    keys = [templated[i % len(templated)] for i in range(keys)]
+    
+    def run():
+        for key in keys:
+            I18nService.translate(key, 'de', count=3, date='2025-01-01', time='08:00')
+    return run
\ No newline at end of file
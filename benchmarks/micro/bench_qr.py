@@ -0,0 +1,35 @@
+"""QRService: fresh renders by payload length, and cache hits"""
+
+from benchmarks.micro import benchmark
+
+# Payload lengths: short link, long link, near the limit of small codes
+SIZES = [16, 128, 512]
+
+
+def _payload(length: int) -> str:
+    url = 'https://example.com/'
+    return url + 'x' * (length - len(url)) if length > len(url) else url[:length]
+
+
+@benchmark(params=SIZES)
+def generate_qr_png(length):
+    from app.services import QRService
+    data = _payload(length)
+    # The private renderer bypasses the cache, so every call draws the code
+    return lambda: QRService._render_png(data, 10, 'L')
+
+
+@benchmark(params=SIZES)
+def generate_qr_svg(length):
+    from app.services import QRService
+    data = _payload(length)
+    return lambda: QRService._render_svg(data, 10, 'L')
+
+
+@benchmark(params=['png', 'svg'])
+def generate_qr_cached(fmt):
+    from app.services import QRService
+    data = _payload(64)
+    generate = QRService.generate_qr_svg if fmt == 'svg' else QRService.generate_qr_png
+    generate(data)
+    return lambda: generate(data)
\ No newline at end of file
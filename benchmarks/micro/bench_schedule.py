@@ -0,0 +1,37 @@
+"""ScheduleService: cached lookups, ranges of growing size, rebuilt indexes"""
+
+from datetime import date, timedelta
+
+from benchmarks.micro import benchmark
+
+
+@benchmark(params=['cached', 'past'])
+def get_hours_for_date(window):
+    from app.services import ScheduleService
+    # Today is served from the cache; three years back needs a range query
+    target = date.today() - timedelta(days=0 if window == 'cached' else 3 * 365)
+    return lambda: ScheduleService.get_hours_for_date(target)
+
+
+@benchmark(params=[1, 3, 12])
+def get_month_schedule(months):
+    from app.services import ScheduleService
+    today = date.today()
+    # Consecutive months starting with the current one
+    targets = [((today.month - 1 + i) // 12 + today.year, (today.month - 1 + i) % 12 + 1)
+               for i in range(months)]
+    
+    def run():
+        for year, month in targets:
+            ScheduleService.get_month_schedule(year, month)
+    return run
+
+
+@benchmark(params=['cached', 'rebuild'])
+def get_next_open_time(index):
+    from app.services import ScheduleService
+    
+    def rebuild():
+        ScheduleService._index = None
+        return ScheduleService.get_next_open_time()
+    return ScheduleService.get_next_open_time if index == 'cached' else rebuild
\ No newline at end of file
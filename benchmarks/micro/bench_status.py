@@ -0,0 +1,14 @@
+"""StatusService: the status every page shows"""
+
+from benchmarks.micro import benchmark
+
+
+@benchmark(params=['cached', 'reload'])
+def get_current_status(cache):
+    from app.services import StatusService
+    
+    def reload():
+        # Next lookup goes to the snapshot (or the database)
+        StatusService._cache = None
+        return StatusService.get_current_status()
+    return StatusService.get_current_status if cache == 'cached' else reload
\ No newline at end of file
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Seed a SQLite database with realistic, reproducible volume
+
+    python -m benchmarks.seed --db data/bench.db --years 5
+
+Every row is derived from --seed and --anchor, the date the history ends
+at. Both are pinned by default, so two runs produce the same rows on any
+day; pass --anchor with today's date for a dataset around the current date.
+The database URL must be known before app.database is imported, so callers
+set DATABASE_URL first (see use_database()).
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import date, datetime, time, timedelta
+
+LANGUAGES = ('th', 'de', 'en')
+
+DEFAULTS = {
+    'years': 5,
+    'statuses': 5000,
+    'announcements': 300,
+    'seed': 42,
+    # The seeded "today": history ends here, exceptions run a year past it
+    'anchor': date(2025, 1, 6),
+}
+
+
+def use_database(path: str):
+    """Point the app at a benchmark database (before importing app.database)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(path)}'
+
+
+def _parse_anchor(value: str) -> date:
+    return date.today() if value == 'today' else date.fromisoformat(value)
+
+
+def add_anchor_argument(parser: argparse.ArgumentParser, default=DEFAULTS['anchor'], shown=None):
+    """--anchor option shared by the seed, load test and micro-benchmark CLIs"""
+    parser.add_argument('--anchor', type=_parse_anchor, default=default,
+                        help=f"date the seeded history ends at, YYYY-MM-DD or 'today' "
+                             f"(default: {shown or default})")
+
+
+def _exception_rows(rng: random.Random, first: date, last: date, now: datetime):
+    """Roughly one exception every week: closed holidays and short days"""
+    rows = []
+    current = first
+    while current <= last:
+        roll = rng.random()
+        if roll < 0.05:
+            rows.append({'exception_date': current, 'closed': True, 'time_ranges': [],
+                         'note': rng.choice(['Holiday', 'Feiertag', 'วันหยุด']), 'created_at': now})
+        elif roll < 0.12:
+            start = rng.choice(['08:00', '08:30', '09:00'])
+            end = rng.choice(['11:00', '11:30', '12:00'])
+            rows.append({'exception_date': current, 'closed': False, 'time_ranges': [f'{start}-{end}'],
+                         'note': rng.choice([None, 'Short day', 'Verkürzt']), 'created_at': now})
+        current += timedelta(days=1)
+    return rows
+
+
+def _availability_rows(rng: random.Random, first: date, last: date, now: datetime):
+    rows = []
+    current = first
+    while current <= last:
+        if current.weekday() < 5 and rng.random() < 0.6:
+            hours = sorted(rng.sample(range(8, 16), 3))
+            rows.append({'availability_date': current,
+                         'time_slots': [f'{hour:02d}:00-{hour:02d}:30' for hour in hours],
+                         'created_at': now})
+        current += timedelta(days=1)
+    return rows
+
+
+def _status_rows(rng: random.Random, count: int, first: date, last: date):
+    """History of status changes, oldest first, all of them expired"""
+    from app.models import StatusType
+    
+    types = [StatusType.URLAUB, StatusType.BILDUNGSURLAUB, StatusType.KONGRESS,
+             StatusType.SONSTIGES, StatusType.ANWESEND]
+    span = (last - first).days
+    rows = []
+    for i in range(count):
+        day = first + timedelta(days=span * i // count)
+        created = datetime.combine(day, datetime.min.time()) + timedelta(minutes=rng.randrange(24 * 60))
+        status_type = rng.choice(types)
+        absent = status_type != StatusType.ANWESEND
+        rows.append({
+            'type': status_type,
+            'date_from': day if absent else None,
+            'date_to': day + timedelta(days=rng.randrange(1, 10)) if absent else None,
+            'description': f'History entry {i}',
+            'next_return': None,
+            'created_at': created,
+            'updated_at': created,
+        })
+    return rows
+
+
+def _announcement_rows(rng: random.Random, per_language: int, first: date, last: date):
+    """Many announcements per language, a few of them still active"""
+    span = (last - first).days
+    rows = []
+    for lang in LANGUAGES:
+        for i in range(per_language):
+            created = datetime.combine(first + timedelta(days=rng.randrange(span)), datetime.min.time())
+            rows.append({
+                'lang': lang,
+                'title': f'[{lang}] Announcement {i}',
+                'body': f'Body text of announcement {i} ' * rng.randrange(1, 6),
+                'active': rng.random() < 0.05,
+                'created_at': created,
+                'updated_at': created,
+            })
+    return rows
+
+
+def seed(years: int = DEFAULTS['years'], statuses: int = DEFAULTS['statuses'],
+         announcements: int = DEFAULTS['announcements'], seed: int = DEFAULTS['seed'],
+         anchor: date = DEFAULTS['anchor']) -> dict:
+    """Create the schema and insert the seeded rows in one transaction"""
+    from sqlalchemy import delete, insert
+    from sqlmodel import Session
+    from app.database import engine, init_database
+    from app.models import Announcement, Availability, HourException, Status, StatusType
+    from app.services import DataVersionService, StatusService
+    
+    init_database()
+    
+    rng = random.Random(seed)
+    today = anchor
+    first = today - timedelta(days=365 * years)
+    last = today + timedelta(days=365)
+    now = datetime.combine(today, time(12))
+    
+    rows = {
+        HourException: _exception_rows(rng, first, last, now),
+        Availability: _availability_rows(rng, today - timedelta(days=30), last, now),
+        Status: _status_rows(rng, statuses, first, today - timedelta(days=1)),
+        Announcement: _announcement_rows(rng, announcements, first, today),
+    }
+    
+    with Session(engine) as session:
+        for model, model_rows in rows.items():
+            session.execute(delete(model))
+            if model_rows:
+                session.execute(insert(model), model_rows)
+        DataVersionService.bump(session)
+        session.commit()
+    
+    # The current status goes through the service, which also sets the pointer
+    StatusService.update_status(StatusType.ANWESEND)
+    
+    return {model.__tablename__: len(model_rows) for model, model_rows in rows.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed a benchmark database')
+    parser.add_argument('--db', default='data/bench.db', help='SQLite file (default: data/bench.db)')
+    parser.add_argument('--years', type=int, default=DEFAULTS['years'], help='years of history')
+    parser.add_argument('--statuses', type=int, default=DEFAULTS['statuses'], help='status history rows')
+    parser.add_argument('--announcements', type=int, default=DEFAULTS['announcements'],
+                        help='announcements per language')
+    parser.add_argument('--seed', type=int, default=DEFAULTS['seed'], help='random seed')
+    add_anchor_argument(parser)
+    args = parser.parse_args()
+    
+    use_database(args.db)
+    counts = seed(args.years, args.statuses, args.announcements, args.seed, args.anchor)
+    print(f"Seeded {args.db}: " + ', '.join(f'{count} {table}' for table, count in counts.items()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""Shared pytest setup: every test run works on a throwaway database"""
+
+import os
+import tempfile
+
+import pytest
+
+# Must be set before app.database creates the engine
+_tmp_dir = tempfile.mkdtemp(prefix='portal-test-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_tmp_dir, 'portal.db')}"
+os.environ.setdefault('DATA_VERSION_TTL', '0')
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app
+    return create_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def cold_caches():
+    """Callable dropping the process-local caches, so the next call hits the database"""
+    from app.services import CalendarService, DataVersionService, ScheduleService, StatusService
+    
+    def reset():
+        DataVersionService.invalidate()
+        ScheduleService._cache = None
+        ScheduleService._index = None
+        StatusService._cache = None
+        CalendarService._cache.clear()
+    return reset
+
+
+@pytest.fixture
+def query_log(app):
+    """Every statement executed during the test, grouped by request (see QueryLog)"""
+    from app.database import count_queries
+    with count_queries() as log:
+        yield log
\ No newline at end of file
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""Export the public pages as a static site for a plain file server
+
+Layout of the output directory:
+    index.html                         home page in the default language
+    <lang>/index.html                  home page
+    <lang>/week/<offset>/index.html    week view, offsets -1..N
+    <lang>/month/<YYYY-MM>/index.html  month view, current month and the next N-1
+    <lang>/announcements/index.html    newest page of announcements
+    <lang>/announcements/<key>/index.html  older pages, one per keyset cursor
+    qr/portal.png, qr/portal.svg(.gz)  QR assets
+
+Only pages whose inputs changed since the last run are rendered again.
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from urllib.parse import quote
+
+MANIFEST_NAME = '.manifest.json'
+
+# Set in each render process by _install()
+_app = None
+_settings = None
+
+
+def _month_add(year: int, month: int, count: int):
+    """Shift (year, month) by count months"""
+    index = year * 12 + (month - 1) + count
+    return index // 12, index % 12 + 1
+
+
+def _cursor_path(cursor: str) -> str:
+    """Directory name of the announcements page starting after cursor"""
+    return hashlib.sha256(cursor.encode('utf-8')).hexdigest()[:16]
+
+
+def _static_url_for(endpoint, **values):
+    """url_for replacement that points at the exported files"""
+    from flask import url_for
+    from app.services import I18nService, ScheduleService
+    
+    prefix = _settings['prefix']
+    lang = I18nService.get_current_language()
+    
+    if endpoint == 'public.set_language':
+        return f"{prefix}/{values['language']}/"
+    if endpoint == 'public.home':
+        return f"{prefix}/{lang}/"
+    if endpoint == 'public.week_view':
+        # Links beyond the exported range stay on the edge page
+        offset = min(max(int(values.get('offset', 0)), -1), _settings['weeks'])
+        return f"{prefix}/{lang}/week/{offset}/"
+    if endpoint == 'public.month_view':
+        months = _settings['months']
+        now = datetime.now(ScheduleService.TIMEZONE)
+        requested = (int(values.get('year', now.year)), int(values.get('month', now.month)))
+        year, month = min(max(requested, tuple(months[0])), tuple(months[-1]))
+        return f"{prefix}/{lang}/month/{year}-{month:02d}/"
+    if endpoint == 'public.announcements_view':
+        before = values.get('before')
+        if before:
+            return f"{prefix}/{lang}/announcements/{_cursor_path(before)}/"
+        return f"{prefix}/{lang}/announcements/"
+    if endpoint == 'public.qr_png':
+        return f"{prefix}/qr/portal.png"
+    if endpoint == 'public.qr_svg':
+        return f"{prefix}/qr/portal.svg"
+    return url_for(endpoint, **values)
+
+
+def _install(app, settings):
+    """Make app render links to the exported files"""
+    from app.services import FragmentCache, PageCache
+    
+    global _app, _settings
+    _settings = settings
+    _app = app
+    _app.jinja_env.globals['url_for'] = _static_url_for
+    
+    # Fragments and pages rendered with the server's url_for must not leak
+    # into the export, and exported pages must not reach the server's cache
+    FragmentCache.clear()
+    PageCache.ENABLED = False
+    PageCache.DISK_DIR = None
+
+
+def _init_worker(settings):
+    """Create one app per worker process"""
+    from app import create_app
+    _install(create_app(), settings)
+
+
+def _render_page(task):
+    """Render one page through the WSGI app and write it"""
+    lang, url, rel_path = task
+    response = _app.test_client().get(url, headers={'Accept-Language': lang})
+    if response.status_code != 200:
+        raise RuntimeError(f'{url} ({lang}) returned {response.status_code}')
+    
+    path = Path(_settings['out']) / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_bytes(response.get_data())
+    os.replace(tmp_path, path)
+    return rel_path
+
+
+def _fingerprint(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, default=str, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _source_mtimes():
+    """Modification times of templates and translation files"""
+    mtimes = {}
+    for folder in ('app/templates', 'app/translations'):
+        for path in sorted(Path(folder).glob('*')):
+            mtimes[str(path)] = path.stat().st_mtime_ns
+    return mtimes
+
+
+def plan_pages(settings):
+    """List (lang, url, path, fingerprint) for every page of the export"""
+    from app.services import (
+        AnnouncementService, I18nService, ScheduleService, StatusService, ConfigService, DataVersionService
+    )
+    
+    today = datetime.now(ScheduleService.TIMEZONE).date()
+    monday = today - timedelta(days=today.weekday())
+    months = settings['months']
+    
+    # Resolve the whole exported date range with one schedule lookup
+    first_day = min(monday - timedelta(weeks=1), date(*months[0], 1))
+    last_year, last_month = _month_add(*months[-1], 1)
+    last_day = max(monday + timedelta(weeks=settings['weeks'], days=6),
+                   date(last_year, last_month, 1) - timedelta(days=1))
+    schedule = {day['date']: day for day in ScheduleService.get_schedule_range(first_day, last_day)}
+    
+    def days(start, end):
+        return [schedule[start + timedelta(days=i)] for i in range((end - start).days + 1)]
+    
+    status = StatusService.get_current_status()
+    common = [
+        ConfigService.get_version(),
+        _source_mtimes(),
+        [status.type, status.description, status.next_return, status.date_to],
+        settings['weeks'],
+        months,
+        settings['prefix']
+    ]
+    
+    pages = []
+    for lang in I18nService.SUPPORTED_LANGUAGES:
+        # The home page depends on the clock and on announcements
+        pages.append((lang, '/', f'{lang}/index.html', _fingerprint(
+            common, lang, DataVersionService.get_version(), ScheduleService.get_state_bucket()
+        )))
+        pages.append((lang, '/announcements', f'{lang}/announcements/index.html', _fingerprint(
+            common, lang, DataVersionService.get_version()
+        )))
+        
+        # Older pages follow the cursor chains from the newest page and from
+        # the home page, whose "older" link starts after FRONT_PAGE_LIMIT items
+        cursors = [AnnouncementService.get_page(lang, AnnouncementService.PAGE_SIZE).next_cursor,
+                   AnnouncementService.get_front_page(lang).next_cursor]
+        seen = set()
+        while cursors:
+            cursor = cursors.pop()
+            if cursor is None or cursor in seen:
+                continue
+            seen.add(cursor)
+            pages.append((lang, f'/announcements?before={quote(cursor)}',
+                          f'{lang}/announcements/{_cursor_path(cursor)}/index.html', _fingerprint(
+                common, lang, DataVersionService.get_version(), cursor
+            )))
+            cursors.append(AnnouncementService.get_page(lang, AnnouncementService.PAGE_SIZE, cursor).next_cursor)
+        
+        for offset in range(-1, settings['weeks'] + 1):
+            start = monday + timedelta(weeks=offset)
+            end = start + timedelta(days=6)
+            pages.append((lang, f'/week?offset={offset}', f'{lang}/week/{offset}/index.html', _fingerprint(
+                common, lang, offset, days(start, end), today if start <= today <= end else None
+            )))
+        
+        for year, month in months:
+            start = date(year, month, 1)
+            next_year, next_month = _month_add(year, month, 1)
+            end = date(next_year, next_month, 1) - timedelta(days=1)
+            pages.append((lang, f'/month?year={year}&month={month}',
+                          f'{lang}/month/{year}-{month:02d}/index.html', _fingerprint(
+                common, lang, days(start, end), today if start <= today <= end else None
+            )))
+    
+    return pages
+
+
+def export(out: str, weeks: int, month_count: int, jobs: int, prefix: str = '', full: bool = False):
+    """Render changed pages into out and write the QR assets"""
+    from app import create_app
+    from app.services import I18nService, QRService, ScheduleService
+    
+    app = create_app()
+    now = datetime.now(ScheduleService.TIMEZONE)
+    settings = {
+        'out': out,
+        'weeks': weeks,
+        'months': [list(_month_add(now.year, now.month, i)) for i in range(month_count)],
+        'prefix': prefix.rstrip('/')
+    }
+    
+    out_path = Path(out)
+    manifest_path = out_path / MANIFEST_NAME
+    manifest = {}
+    if manifest_path.exists() and not full:
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    
+    with app.app_context():
+        pages = plan_pages(settings)
+    tasks = [(lang, url, rel_path) for lang, url, rel_path, fingerprint in pages
+             if manifest.get(rel_path) != fingerprint or not (out_path / rel_path).exists()]
+    
+    if tasks:
+        if jobs > 1:
+            # Fresh interpreters, so no SQLite connection crosses a fork
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=jobs, mp_context=context,
+                                     initializer=_init_worker, initargs=(settings,)) as pool:
+                list(pool.map(_render_page, tasks, chunksize=4))
+        else:
+            _install(app, settings)
+            for task in tasks:
+                _render_page(task)
+    
+    # Pages that dropped out of the range (e.g. past months)
+    current = {rel_path: fingerprint for _, _, rel_path, fingerprint in pages}
+    for rel_path in set(manifest) - set(current):
+        stale = out_path / rel_path
+        if stale.exists():
+            stale.unlink()
+        # Remove the directories this left empty, deepest first
+        for parent in stale.parents:
+            if parent == out_path:
+                break
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+    
+    # Root entry point in the default language
+    shutil.copyfile(out_path / I18nService.DEFAULT_LANGUAGE / 'index.html', out_path / 'index.html')
+    
+    site_url = os.getenv('SITE_URL', 'http://localhost:5000')
+    QRService.save_qr_files(site_url, base_path=str(out_path / 'qr'))
+    
+    manifest_path.write_text(json.dumps(current, indent=2), encoding='utf-8')
+    return len(tasks), len(pages) - len(tasks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the portal as static files')
+    parser.add_argument('--out', default='site', help='output directory (default: site)')
+    parser.add_argument('--weeks', type=int, default=8, help='export week offsets -1..N (default: 8)')
+    parser.add_argument('--months', type=int, default=3, help='export the next N months (default: 3)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='render processes (default: CPU count)')
+    parser.add_argument('--prefix', default='', help='URL path the site is served under, e.g. /portal')
+    parser.add_argument('--full', action='store_true', help='render every page again')
+    args = parser.parse_args()
+    
+    rendered, skipped = export(args.out, args.weeks, args.months, args.jobs, args.prefix, args.full)
+    print(f"Exported to {args.out}: {rendered} pages rendered, {skipped} unchanged")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""gunicorn settings: build the app once in the master, then fork the workers
+
+    gunicorn -c gunicorn.conf.py run:app
+"""
+
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# create_app() (database init, migrations, QR files) runs once, not per worker
+preload_app = True
+
+
+def when_ready(server):
+    """Warm read-mostly state in the master; workers inherit it on fork"""
+    from app.database import engine
+    from app.services import (
+        ConfigService, I18nService, ScheduleService, SnapshotService, StatusService
+    )
+    
+    SnapshotService.publish()
+    ConfigService.get()
+    ScheduleService.get_weekly_template()
+    StatusService.get_current_status()
+    # Merged into every other language's catalog anyway
+    I18nService.get_catalog(I18nService.DEFAULT_LANGUAGE)
+    
+    # No pooled connection may cross the fork
+    engine.dispose()
+
+
+def post_fork(server, worker):
+    """Give each worker its own connection pool"""
+    from app.database import engine
+    engine.dispose(close=False)
\ No newline at end of file
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Import exception days and availability slots in one transaction
+
+    python import_data.py config                          hours.exceptions and availability.indicative_slots
+    python import_data.py holidays.csv --kind exceptions  CSV: date,closed,time_ranges,note
+    python import_data.py slots.csv --kind availability   CSV: date,time_slots
+    python import_data.py data.json                       {"exceptions": [...], "availability": [...]}
+
+Ranges in CSV cells are separated by ';', e.g. 08:30-12:00;13:00-16:00.
+Existing rows are matched by date and updated; nothing is deleted.
+"""
+
+import argparse
+import json
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import exception days and availability slots')
+    parser.add_argument('source', help="'config' for config.yml, or a .csv/.json file")
+    parser.add_argument('--kind', choices=['exceptions', 'availability'],
+                        help='record kind of a CSV file or a plain JSON list')
+    parser.add_argument('--dry-run', action='store_true', help='validate and report, but do not write')
+    args = parser.parse_args()
+    
+    from app.database import init_database
+    from app.services import ConfigService, ImportService
+    
+    init_database()
+    
+    try:
+        if args.source == 'config':
+            records = ImportService.from_config(ConfigService.get())
+            source = ConfigService.CONFIG_PATH
+        else:
+            records = ImportService.read_file(args.source, args.kind)
+            source = args.source
+        report = ImportService.import_records(source=source, dry_run=args.dry_run, **records)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    
+    print(json.dumps(report, indent=2))
+    if args.dry_run:
+        print("Dry run: nothing was written")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""Keyset pagination of announcements: no gaps, no duplicates, stable cursors"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, delete
+
+
+@pytest.fixture
+def announcements(app):
+    """Seven Thai announcements; three share one created_at to exercise the id tiebreak"""
+    from app.database import engine
+    from app.models import Announcement
+    
+    base = datetime(2025, 1, 31, 8, 0)
+    stamps = [base - timedelta(days=n) for n in range(4)] + [base - timedelta(days=4)] * 3
+    with Session(engine) as session:
+        rows = [Announcement(lang='th', title=f'#{n}', body='', created_at=stamp)
+                for n, stamp in enumerate(stamps)]
+        session.add_all(rows)
+        # A hidden announcement never shows up on any page
+        session.add(Announcement(lang='th', title='hidden', body='', active=False, created_at=base))
+        session.commit()
+        # Newest first, ties broken by the higher id
+        expected = [row.id for row in sorted(rows, key=lambda row: (row.created_at, row.id), reverse=True)]
+    
+    yield expected
+    
+    with Session(engine) as session:
+        session.exec(delete(Announcement).where(Announcement.lang == 'th'))
+        session.commit()
+
+
+def _walk(page_size):
+    from app.services import AnnouncementService
+    ids, cursor, pages = [], None, 0
+    while True:
+        page = AnnouncementService.get_page('th', page_size, cursor)
+        ids += [item['id'] for item in page.items]
+        pages += 1
+        if page.next_cursor is None:
+            return ids, pages
+        cursor = page.next_cursor
+
+
+@pytest.mark.parametrize('page_size', [1, 2, 3, 4, 5, 7, 8])
+def test_pages_cover_every_announcement_once(announcements, page_size):
+    ids, pages = _walk(page_size)
+    
+    assert ids == announcements
+    # An exactly full last page has no cursor, so no empty page follows
+    assert pages == -(-len(announcements) // page_size)
+
+
+def test_ties_on_created_at_split_across_pages(announcements):
+    from app.services import AnnouncementService
+    
+    # The page boundary falls between two of the three equal timestamps
+    first = AnnouncementService.get_page('th', 5)
+    second = AnnouncementService.get_page('th', 5, first.next_cursor)
+    
+    assert first.items[-1]['created_at'] == second.items[0]['created_at']
+    assert [item['id'] for item in first.items + second.items] == announcements
+    assert second.next_cursor is None
+
+
+def test_cursor_round_trips():
+    from app.services import AnnouncementService
+    
+    item = {'id': 42, 'created_at': datetime(2025, 1, 31, 8, 0, 0, 123456)}
+    cursor = AnnouncementService.encode_cursor(item)
+    
+    assert AnnouncementService.decode_cursor(cursor) == (item['created_at'], 42)
+
+
+@pytest.mark.parametrize('cursor', ['garbage', '2025-01-31T08:00:00', '2025-13-01T00:00:00_1', '2025-01-31T08:00:00_x'])
+def test_invalid_cursor_is_a_bad_request(client, cursor):
+    response = client.get('/announcements', query_string={'before': cursor})
+    
+    assert response.status_code == 400
+
+
+def test_home_links_to_the_second_page(client, announcements, monkeypatch):
+    from app.services import AnnouncementService
+    monkeypatch.setattr(AnnouncementService, 'FRONT_PAGE_LIMIT', 3)
+    headers = {'Accept-Language': 'th'}
+    
+    home = client.get('/', headers=headers).get_data(as_text=True)
+    cursor = AnnouncementService.get_page('th', 3).next_cursor
+    link = f'/announcements?before={cursor}'
+    assert f'href="{link}"' in home
+    
+    older = client.get(link, headers=headers).get_data(as_text=True)
+    # The second page starts right after the last announcement on the home page
+    assert '#3' in older and '#2' not in older
\ No newline at end of file
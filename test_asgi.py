@@ -0,0 +1,231 @@
+"""ASGI adapter: drives AsyncPortal with scope/receive/send like a server would"""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from werkzeug.wrappers import Request
+
+from app.asgi import MAX_MEMORY_BODY, AsyncPortal
+
+
+def _scope(path='/', query=b'', headers=(), method='GET', root_path=''):
+    return {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'scheme': 'http', 'path': path, 'query_string': query,
+        'root_path': root_path, 'headers': list(headers),
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+    }
+
+
+class Client:
+    """receive() hands out the request body, then waits for disconnect()"""
+    
+    def __init__(self, body_chunks=(b'',), disconnect_after=None, fail_after=None):
+        self.messages = [{'type': 'http.request', 'body': chunk, 'more_body': i < len(body_chunks) - 1}
+                         for i, chunk in enumerate(body_chunks)]
+        self.sent = []
+        # Disconnect (or make send raise, as ASGI 2.4 allows) after this many body chunks
+        self.disconnect_after = disconnect_after
+        self.fail_after = fail_after
+        self.gone = None
+    
+    async def receive(self):
+        if self.messages:
+            return self.messages.pop(0)
+        await self.gone.wait()
+        return {'type': 'http.disconnect'}
+    
+    async def send(self, message):
+        if self.fail_after is not None and len(self.chunks) >= self.fail_after:
+            raise OSError('client disconnected')
+        self.sent.append(message)
+        if self.disconnect_after is not None and len(self.chunks) >= self.disconnect_after:
+            self.gone.set()
+    
+    @property
+    def chunks(self):
+        return [message['body'] for message in self.sent if message['type'] == 'http.response.body']
+    
+    async def run(self, portal, scope):
+        self.gone = asyncio.Event()
+        await portal(scope, self.receive, self.send)
+
+
+@pytest.fixture
+def portal():
+    """Callable wrapping a WSGI app, stopped after the test"""
+    portals = []
+    
+    def wrap(wsgi_app):
+        portals.append(AsyncPortal(wsgi_app, threads=4, qr_workers=2))
+        return portals[-1]
+    yield wrap
+    for created in portals:
+        created._stop()
+
+
+def _echo(environ, start_response):
+    request = Request(environ)
+    body = json.dumps({
+        'path': request.path,
+        'script_root': request.script_root,
+        'args': request.args.to_dict(flat=False),
+        'cookies': request.cookies.to_dict(),
+        'accept': request.headers.get('Accept'),
+        'agent': request.headers.get('User-Agent'),
+        'body': len(request.get_data()),
+    }).encode('utf-8')
+    start_response('200 OK', [('Content-Type', 'application/json'), ('X-Name', 'Müller')])
+    return [body]
+
+
+def test_headers_and_query_reach_the_app_decoded(portal):
+    client = Client()
+    asyncio.run(client.run(portal(_echo), _scope(
+        path='/portal/wartezimmer/ä', root_path='/portal', query=b'q=%C3%A4&a=1&a=2&empty=',
+        headers=[(b'host', b'example.org'), (b'accept', b'text/html'), (b'accept', b'*/*'),
+                 (b'cookie', b'lang=th'), (b'cookie', b'session=abc'),
+                 (b'user-agent', 'Müller'.encode('latin1'))]
+    )))
+    
+    start, *_ = client.sent
+    echoed = json.loads(b''.join(client.chunks))
+    assert start['status'] == 200
+    # Response headers go out as latin-1 bytes, names lowercased
+    assert (b'x-name', 'Müller'.encode('latin1')) in start['headers']
+    assert echoed['path'] == '/wartezimmer/ä'
+    assert echoed['script_root'] == '/portal'
+    assert echoed['args'] == {'q': ['ä'], 'a': ['1', '2'], 'empty': ['']}
+    # Repeated headers are joined, split cookie headers with ';'
+    assert echoed['accept'] == 'text/html,*/*'
+    assert echoed['cookies'] == {'lang': 'th', 'session': 'abc'}
+    assert echoed['agent'] == 'Müller'
+
+
+def test_request_body_arrives_in_chunks(portal):
+    chunks = [b'x' * 1000, b'y' * MAX_MEMORY_BODY, b'z']
+    client = Client(body_chunks=chunks)
+    asyncio.run(client.run(portal(_echo), _scope(method='POST', headers=[
+        (b'content-length', str(sum(map(len, chunks))).encode()),
+        (b'content-type', b'application/octet-stream')])))
+    
+    assert json.loads(b''.join(client.chunks))['body'] == sum(map(len, chunks))
+
+
+def test_response_is_streamed_chunk_by_chunk(portal):
+    def stream(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        yield b'first'
+        yield b''
+        yield b'second'
+    
+    client = Client()
+    asyncio.run(client.run(portal(stream), _scope()))
+    
+    assert [message['type'] for message in client.sent] == [
+        'http.response.start', 'http.response.body', 'http.response.body', 'http.response.body']
+    assert client.chunks == [b'first', b'second', b'']
+    assert [message.get('more_body') for message in client.sent[1:]] == [True, True, False]
+
+
+def test_empty_response_still_starts_and_ends(portal):
+    def empty(environ, start_response):
+        start_response('204 No Content', [])
+        return []
+    
+    client = Client()
+    asyncio.run(client.run(portal(empty), _scope()))
+    
+    assert client.sent == [{'type': 'http.response.start', 'status': 204, 'headers': []},
+                           {'type': 'http.response.body', 'body': b'', 'more_body': False}]
+
+
+def _endless():
+    """WSGI app streaming until told to stop; records what it produced"""
+    state = {'produced': 0, 'closed': threading.Event()}
+    
+    def app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        try:
+            while state['produced'] < 10000:
+                state['produced'] += 1
+                time.sleep(0.001)
+                yield b'chunk'
+        finally:
+            state['closed'].set()
+    return app, state
+
+
+@pytest.mark.parametrize('gone', [
+    {'disconnect_after': 3},   # the server reports http.disconnect
+    {'fail_after': 3},         # the server raises on send
+], ids=['disconnect-message', 'send-raises'])
+def test_disconnect_mid_response_stops_the_app(portal, gone):
+    app, state = _endless()
+    client = Client(**gone)
+    asyncio.run(client.run(portal(app), _scope()))
+    
+    assert state['closed'].is_set()
+    # A chunk already on its way may still go out
+    assert 3 <= len(client.chunks) <= 4
+    # It stopped soon after the client left, not after all 10000 chunks
+    assert state['produced'] < 100
+
+
+def test_body_stays_open_until_the_app_thread_finishes(portal):
+    release = threading.Event()
+    read = {}
+    
+    def slow(environ, start_response):
+        release.wait(5)
+        read['body'] = environ['wsgi.input'].read()
+        start_response('200 OK', [])
+        return [b'']
+    
+    wrapped = portal(slow)
+    
+    async def cancel_while_running():
+        client = Client(body_chunks=[b'payload'])
+        task = asyncio.ensure_future(client.run(wrapped, _scope(method='POST')))
+        await asyncio.sleep(0.05)
+        # The server gives up on the request while the app still runs
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        release.set()
+    
+    asyncio.run(cancel_while_running())
+    wrapped.executor.shutdown(wait=True)
+    
+    assert read['body'] == b'payload'
+
+
+def test_concurrent_scans_share_one_render(portal, monkeypatch):
+    from app.services import QRService
+    
+    renders = []
+    
+    def render(target, fmt):
+        renders.append((target, fmt))
+        time.sleep(0.1)
+        return b'png', 'etag'
+    monkeypatch.setattr(QRService, 'render', render)
+    monkeypatch.setattr(QRService, 'is_cached', lambda target, fmt: False)
+    
+    def ok(environ, start_response):
+        start_response('200 OK', [])
+        return [b'']
+    wrapped = portal(ok)
+    
+    async def burst():
+        scans = [Client().run(wrapped, _scope(path='/qr', query=b'target=https%3A%2F%2Fexample.org%2F'))
+                 for _ in range(8)]
+        scans.append(Client().run(wrapped, _scope(path='/qr.svg', query=b'target=https%3A%2F%2Fexample.org%2F')))
+        await asyncio.gather(*scans)
+    asyncio.run(burst())
+    
+    assert sorted(renders) == [('https://example.org/', 'png'), ('https://example.org/', 'svg')]
+    assert not wrapped._inflight
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""Content-Encoding negotiation and revalidation of compressed variants"""
+
+import gzip
+
+import pytest
+
+# Routes with content-hash ETags whose bodies are large enough to compress
+REVALIDATED = ['/', '/qr.svg', '/calendar.ics']
+
+
+def test_gzip_when_accepted(client):
+    response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.get_etag()[0].endswith('-gzip')
+    assert b'</html>' in gzip.decompress(response.get_data())
+
+
+@pytest.mark.parametrize('accept', [None, 'identity', 'gzip;q=0', 'compress'])
+def test_identity_when_gzip_not_accepted(client, accept):
+    headers = {'Accept-Encoding': accept} if accept else {}
+    response = client.get('/', headers=headers)
+    assert 'Content-Encoding' not in response.headers
+    assert not response.get_etag()[0].endswith('-gzip')
+    assert b'</html>' in response.get_data()
+
+
+def test_small_bodies_stay_uncompressed(client):
+    response = client.get('/healthz', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+@pytest.mark.parametrize('url', REVALIDATED)
+def test_304_echoes_the_variant_etag(client, url):
+    first = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    etag = first.headers['ETag']
+    assert etag.endswith('-gzip"'), url
+    
+    revalidated = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert revalidated.status_code == 304, url
+    assert revalidated.headers['ETag'] == etag
+    assert not revalidated.get_data()
+
+
+@pytest.mark.parametrize('url', REVALIDATED)
+def test_304_keeps_the_plain_etag(client, url):
+    etag = client.get(url).headers['ETag']
+    assert '-gzip' not in etag
+    
+    revalidated = client.get(url, headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304, url
+    assert revalidated.headers['ETag'] == etag
+
+
+def test_stale_etag_gets_a_full_response(client):
+    response = client.get('/qr.svg', headers={'Accept-Encoding': 'gzip', 'If-None-Match': '"outdated-gzip"'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+
+def test_large_calendar_feed_is_compressed(client, monkeypatch):
+    from app.services import CalendarService
+    payload = b'BEGIN:VCALENDAR\r\n' + b'X-FILLER:opening hours\r\n' * 10000 + b'END:VCALENDAR\r\n'
+    monkeypatch.setattr(CalendarService, 'get_feed', classmethod(lambda cls, lang: (payload, 'large-feed')))
+    
+    response = client.get('/calendar.ics', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert int(response.headers['Content-Length']) < len(payload)
+    assert gzip.decompress(response.get_data()) == payload
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""The data version must count every committed write, also concurrent ones"""
+
+from sqlmodel import Session
+
+
+def _stored_version(engine) -> int:
+    from app.models import Settings
+    from app.services import DataVersionService
+    with Session(engine) as session:
+        return session.get(Settings, DataVersionService.SETTINGS_KEY).value['version']
+
+
+def test_concurrent_bumps_are_not_lost(app):
+    from app.database import engine
+    from app.models import Settings
+    from app.services import DataVersionService
+    
+    start = _stored_version(engine)
+    with Session(engine) as first, Session(engine) as second:
+        # Both writers have seen the same version before either commits
+        second.get(Settings, DataVersionService.SETTINGS_KEY)
+        assert DataVersionService.bump(first) == start + 1
+        first.commit()
+        assert DataVersionService.bump(second) == start + 2
+        second.commit()
+    
+    assert _stored_version(engine) == start + 2
+
+
+def test_one_bump_per_transaction(app):
+    from app.database import engine
+    from app.services import DataVersionService
+    
+    start = _stored_version(engine)
+    with Session(engine) as session:
+        DataVersionService.bump(session)
+        assert DataVersionService.bump(session) is None
+        session.commit()
+    
+    assert _stored_version(engine) == start + 1
\ No newline at end of file
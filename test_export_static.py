@@ -0,0 +1,95 @@
+"""Static export: every link resolves to an exported file, reruns only render changes"""
+
+import json
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, delete
+
+import export_static
+
+
+@pytest.fixture
+def site(app, tmp_path, monkeypatch):
+    """Callable exporting into tmp_path; the server's caches are restored afterwards"""
+    from app.services import AnnouncementService, FragmentCache, PageCache
+    
+    monkeypatch.setenv('SITE_URL', 'http://localhost:5000')
+    monkeypatch.setattr(PageCache, 'ENABLED', PageCache.ENABLED)
+    monkeypatch.setattr(PageCache, 'DISK_DIR', PageCache.DISK_DIR)
+    monkeypatch.setattr(AnnouncementService, 'PAGE_SIZE', 2)
+    monkeypatch.setattr(AnnouncementService, 'FRONT_PAGE_LIMIT', 3)
+    
+    def run(**options):
+        return export_static.export(str(tmp_path), weeks=1, month_count=1, jobs=1, **options)
+    yield run
+    # Fragments rendered with the static url_for must not reach other tests
+    FragmentCache.clear()
+
+
+@pytest.fixture
+def announcements(app):
+    from app.database import engine
+    from app.models import Announcement
+    
+    base = datetime(2025, 1, 31, 8, 0)
+    with Session(engine) as session:
+        session.add_all([Announcement(lang='th', title=f'#{n}', body='', created_at=base - timedelta(days=n))
+                         for n in range(7)])
+        session.commit()
+    yield
+    with Session(engine) as session:
+        session.exec(delete(Announcement).where(Announcement.lang == 'th'))
+        session.commit()
+
+
+def _announcement_links(page):
+    return re.findall(r'href="(/th/announcements/[^"]*)"', page.read_text(encoding='utf-8'))
+
+
+def test_older_announcement_pages_are_exported(site, announcements, tmp_path):
+    site()
+    
+    # Follow the "older" links from the home page and from the newest page
+    titles, pending, visited = set(), ['/th/', '/th/announcements/'], set()
+    while pending:
+        url = pending.pop()
+        if url in visited:
+            continue
+        visited.add(url)
+        page = tmp_path / url.strip('/') / 'index.html'
+        assert page.exists(), url
+        if '/announcements/' in url:
+            titles.update(re.findall(r'#\d', page.read_text(encoding='utf-8')))
+        pending += _announcement_links(page)
+    
+    assert titles == {f'#{n}' for n in range(7)}
+    # The newest page, three pages of two from there and two more after the home page
+    assert len(visited - {'/th/'}) == 1 + 3 + 2
+
+def test_incremental_export_renders_changes_and_drops_stale_pages(site, tmp_path):
+    first, _ = site()
+    assert first > 0
+    
+    # Nothing changed: nothing is rendered again
+    assert site()[0] == 0
+    
+    # A page from a previous run that is no longer in the range
+    stale = tmp_path / 'th' / 'month' / '2000-01' / 'index.html'
+    stale.parent.mkdir(parents=True)
+    stale.write_text('old', encoding='utf-8')
+    manifest_path = tmp_path / export_static.MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    manifest['th/month/2000-01/index.html'] = 'old'
+    manifest_path.write_text(json.dumps(manifest), encoding='utf-8')
+    
+    # A page deleted by hand is rendered again
+    (tmp_path / 'de' / 'week' / '0' / 'index.html').unlink()
+    assert site()[0] == 1
+    assert (tmp_path / 'de' / 'week' / '0' / 'index.html').exists()
+    
+    assert not stale.exists()
+    # Its empty directory goes too, the parent still holds the current months
+    assert not stale.parent.exists()
+    assert (tmp_path / 'th' / 'month').is_dir()
\ No newline at end of file
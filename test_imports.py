@@ -0,0 +1,139 @@
+"""Bulk imports: upsert counts, one data-version bump, row-level errors"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, delete, inspect, text
+from sqlmodel import Session, SQLModel, select
+
+from test_data_version import _stored_version
+
+# Far from any date the other tests or the config touch
+DAY = date(2099, 3, 2)
+
+
+@pytest.fixture
+def clean_exceptions(app):
+    from app.database import engine
+    from app.models import HourException
+    
+    def clean():
+        with Session(engine) as session:
+            session.exec(delete(HourException).where(HourException.exception_date >= DAY))
+            session.commit()
+    clean()
+    yield
+    clean()
+
+
+def _records(*notes):
+    return [{'date': f'2099-03-{n + 2:02d}', 'time_ranges': '09:00-12:00', 'note': note}
+            for n, note in enumerate(notes)]
+
+
+def test_counts_inserted_updated_and_unchanged(clean_exceptions):
+    from app.services import ImportService
+    
+    first = ImportService.import_records(exceptions=_records('a', 'b'))
+    assert first['exceptions'] == {'inserted': 2, 'updated': 0, 'unchanged': 0}
+    
+    # One changed, one the same, one new
+    second = ImportService.import_records(exceptions=_records('a', 'changed', 'c'))
+    assert second['exceptions'] == {'inserted': 1, 'updated': 1, 'unchanged': 1}
+    
+    from app.database import engine
+    from app.models import HourException
+    with Session(engine) as session:
+        notes = session.exec(select(HourException.note).where(HourException.exception_date >= DAY)
+                             .order_by(HourException.exception_date)).all()
+    assert notes == ['a', 'changed', 'c']
+
+
+def test_one_version_bump_per_import(clean_exceptions):
+    from app.database import engine
+    from app.services import ImportService
+    
+    start = _stored_version(engine)
+    ImportService.import_records(exceptions=_records(*'abcdefgh'))
+    assert _stored_version(engine) == start + 1
+    
+    # Nothing changed: no bump, caches stay valid
+    ImportService.import_records(exceptions=_records(*'abcdefgh'))
+    assert _stored_version(engine) == start + 1
+
+
+def test_dry_run_writes_nothing(clean_exceptions):
+    from app.database import engine
+    from app.services import ImportService
+    
+    start = _stored_version(engine)
+    report = ImportService.import_records(exceptions=_records('a'), dry_run=True)
+    
+    assert report['exceptions']['inserted'] == 1
+    assert ImportService.import_records(exceptions=_records('a'))['exceptions']['inserted'] == 1
+    assert _stored_version(engine) == start + 1
+
+
+def test_every_bad_row_is_reported(clean_exceptions):
+    from app.database import engine
+    from app.services import ImportService
+    
+    start = _stored_version(engine)
+    with pytest.raises(ValueError) as error:
+        ImportService.import_records(source='holidays.csv', exceptions=[
+            {'date': '2099-03-02', 'closed': 'yes'},
+            {'date': '2099-02-30'},
+            {'date': '2099-03-03', 'time_ranges': '12:00-09:00'},
+            {'date': '2099-03-04', 'closed': 'yes', 'time_ranges': '09:00-12:00'},
+            {'date': '2099-03-02', 'closed': 'yes'},
+        ], availability=[{'date': '2099-03-02'}])
+    
+    assert str(error.value).splitlines() == [
+        "holidays.csv: exceptions #2: invalid date '2099-02-30', expected YYYY-MM-DD",
+        "holidays.csv: exceptions #3: invalid time range '12:00-09:00'",
+        "holidays.csv: exceptions #4: a closed day cannot have time ranges",
+        "holidays.csv: exceptions #5: duplicate date 2099-03-02",
+        "holidays.csv: availability #1: time_slots must not be empty",
+    ]
+    # The valid first row is not imported either
+    assert _stored_version(engine) == start
+
+
+def test_exception_dates_are_unique(app, clean_exceptions):
+    from sqlalchemy.exc import IntegrityError
+    from app.database import engine
+    from app.models import HourException
+    
+    with Session(engine) as session:
+        session.add_all([HourException(exception_date=DAY, closed=True),
+                         HourException(exception_date=DAY, closed=True)])
+        with pytest.raises(IntegrityError):
+            session.commit()
+
+
+def test_migration_keeps_the_first_exception_per_date(tmp_path):
+    from app.migrations import run_migrations
+    from app.models import Settings
+    
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        # The schema before migration 3: a plain index and duplicate dates
+        session.execute(text("DROP INDEX ux_hourexception_exception_date"))
+        session.execute(text("CREATE INDEX ix_hourexception_exception_date ON hourexception (exception_date)"))
+        session.execute(text(
+            "INSERT INTO hourexception (id, exception_date, closed, time_ranges, note, created_at) VALUES "
+            "(1, '2099-03-02', 1, '[]', 'first', '2025-01-01'), "
+            "(2, '2099-03-02', 1, '[]', 'second', '2025-01-01'), "
+            "(3, '2099-03-03', 1, '[]', 'other', '2025-01-01')"
+        ))
+        session.add(Settings(key='schema_version', value={'version': 2}))
+        session.commit()
+    
+    assert run_migrations(engine) == [3]
+    
+    with Session(engine) as session:
+        notes = session.execute(text("SELECT note FROM hourexception ORDER BY id")).scalars().all()
+    assert notes == ['first', 'other']
+    indexes = {index['name']: index['unique'] for index in inspect(engine).get_indexes('hourexception')}
+    assert indexes == {'ux_hourexception_exception_date': 1}
\ No newline at end of file
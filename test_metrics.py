@@ -0,0 +1,21 @@
+"""Prometheus exposition of the cache statistics"""
+
+
+def test_cache_counters_and_hit_ratio():
+    from app.services import MetricsService
+    
+    lines = MetricsService._render_caches({
+        'page': {'hits': 2, 'disk_hits': 1, 'misses': 1, 'entries': 3},
+        'snapshot': {'publishes': 4, 'maps': 2, 'data_version': 7, 'path': '/tmp/x'},
+    })
+    
+    # Monotonic fields are counters with _total, sizes and versions gauges
+    assert '# TYPE portal_cache_disk_hits_total counter' in lines
+    assert '# TYPE portal_cache_publishes_total counter' in lines
+    assert 'portal_cache_maps_total{cache="snapshot"} 2' in lines
+    assert '# TYPE portal_cache_entries gauge' in lines
+    assert 'portal_cache_data_version{cache="snapshot"} 7' in lines
+    assert not any('path' in line for line in lines)
+    # A disk hit is a hit: 3 of 4 lookups
+    assert 'portal_cache_hit_ratio{cache="page"} 0.7500' in lines
+    assert not any(line.startswith('portal_cache_hit_ratio{cache="snapshot"') for line in lines)
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""The shared disk store keeps one file per page, whatever the data version"""
+
+import pytest
+from sqlmodel import Session
+
+
+@pytest.fixture
+def disk_cache(app, tmp_path, monkeypatch):
+    from app.services import PageCache
+    
+    monkeypatch.setattr(PageCache, 'ENABLED', True)
+    monkeypatch.setattr(PageCache, 'DISK_DIR', str(tmp_path))
+    PageCache.clear()
+    yield tmp_path
+    PageCache.clear()
+
+
+def _bump():
+    from app.database import engine
+    from app.services import DataVersionService
+    with Session(engine) as session:
+        DataVersionService.bump(session)
+        session.commit()
+
+
+def test_new_versions_overwrite_the_page_file(client, disk_cache):
+    for _ in range(3):
+        assert client.get('/week').status_code == 200
+        _bump()
+    client.get('/week?offset=1')
+    
+    assert len(list(disk_cache.glob('*.page'))) == 2
+    assert not list(disk_cache.glob('*.tmp'))
+
+
+def test_other_workers_read_the_current_page_only(client, disk_cache):
+    from app.services import PageCache
+    
+    first = client.get('/week').get_data()
+    # Another worker: nothing in memory, the same disk store
+    PageCache.clear()
+    hits = PageCache.cache_stats()['disk_hits']
+    assert client.get('/week').get_data() == first
+    assert PageCache.cache_stats()['disk_hits'] == hits + 1
+    
+    # After a write the file holds an outdated version: a miss, not a stale page
+    _bump()
+    PageCache.clear()
+    misses = PageCache.cache_stats()['misses']
+    client.get('/week')
+    assert PageCache.cache_stats()['misses'] == misses + 1
\ No newline at end of file
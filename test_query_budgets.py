@@ -0,0 +1,124 @@
+"""Query budgets of routes and services, and N+1 detection
+
+Views and service methods declare @query_budget(n): the most statements they
+may issue with cold process caches and without the shared snapshot. Going
+over it, or running one statement with many different parameters in a
+single request, fails with the statements listed.
+"""
+
+from datetime import date, timedelta
+import inspect
+
+import pytest
+
+from app.database import QueryBudgetExceeded, count_queries
+
+# Example values for URL rules with arguments, and extra query strings worth budgeting
+RULE_ARGUMENTS = {'language': 'de'}
+EXTRA_URLS = [
+    '/month?year=2020&month=1',
+    '/week?offset=60',
+    '/api/v1/schedule?from=2020-01-01&to=2021-12-31',
+    '/announcements?before=2025-01-01T00:00:00_1000',
+]
+
+
+@pytest.fixture
+def worst_case(app, cold_caches, monkeypatch):
+    """Cold caches, no snapshot and a stored status"""
+    from app.models import StatusType
+    from app.services import SnapshotService, StatusService
+    
+    monkeypatch.setattr(SnapshotService, 'ENABLED', False)
+    with app.app_context():
+        StatusService.update_status(StatusType.ANWESEND)
+    return cold_caches
+
+
+def _get_rules(app):
+    return [rule for rule in app.url_map.iter_rules()
+            if 'GET' in rule.methods and rule.endpoint != 'static']
+
+
+def _url(app, rule) -> str:
+    with app.test_request_context():
+        from flask import url_for
+        return url_for(rule.endpoint, **{name: RULE_ARGUMENTS[name] for name in rule.arguments})
+
+
+def test_every_route_declares_a_budget(app):
+    missing = [rule.rule for rule in _get_rules(app)
+               if not hasattr(app.view_functions[rule.endpoint], 'query_budget')]
+    assert not missing, f'routes without @query_budget: {missing}'
+
+
+def test_routes_stay_within_budget(app, client, worst_case):
+    urls = [_url(app, rule) for rule in _get_rules(app)] + EXTRA_URLS
+    adapter = app.url_map.bind('localhost')
+    
+    for url in urls:
+        endpoint, _ = adapter.match(url.split('?')[0])
+        worst_case()
+        with count_queries() as log:
+            response = client.get(url)
+            # Streamed bodies run their queries while being read
+            response.get_data()
+            response.close()
+        assert response.status_code < 400, url
+        log.check(app.view_functions[endpoint].query_budget, url)
+
+
+def test_services_stay_within_budget(app, worst_case):
+    from app.services import ScheduleService, StatusService
+    
+    today = date.today()
+    calls = [
+        (ScheduleService.get_hours_for_date, (today,)),
+        (ScheduleService.get_hours_for_date, (today - timedelta(days=3 * 365),)),
+        (ScheduleService.get_week_schedule, (today,)),
+        (ScheduleService.get_month_schedule, (2020, 1)),
+        (ScheduleService.get_schedule_range, (today - timedelta(days=730), today)),
+        (ScheduleService._get_range_data, (today - timedelta(days=730), today)),
+        (ScheduleService.is_open_now, ()),
+        (ScheduleService.get_next_open_time, ()),
+        (ScheduleService.get_state, ()),
+        (ScheduleService.get_state_bucket, ()),
+        (StatusService.get_current_status, ()),
+    ]
+    for func, args in calls:
+        worst_case()
+        with app.app_context(), count_queries() as log:
+            func(*args)
+        log.check(func.query_budget, func.__qualname__)
+
+
+def test_budgets_are_not_on_generators():
+    import app.services
+    
+    # Calling a generator function runs none of its body, so its budget
+    # would be checked against zero queries
+    generators = []
+    for cls in vars(app.services).values():
+        if not inspect.isclass(cls):
+            continue
+        for name, attr in vars(cls).items():
+            func = getattr(attr, '__func__', attr)
+            if hasattr(func, 'query_budget') and inspect.isgeneratorfunction(func):
+                generators.append(f'{cls.__name__}.{name}')
+    assert not generators, f'@query_budget on generators: {generators}'
+
+
+def test_repeated_statements_are_reported(app, query_log):
+    from app.database import db_session
+    from app.models import Status
+    
+    # The classic N+1: one lookup per id instead of one IN query
+    with app.app_context(), db_session() as session:
+        for status_id in (1001, 1002, 1003):
+            session.get(Status, status_id)
+    
+    assert len(query_log.repeated()) == 1
+    with pytest.raises(QueryBudgetExceeded, match='likely N\\+1'):
+        query_log.check(budget=10, what='loop')
+    with pytest.raises(QueryBudgetExceeded, match='3 queries, budget 2'):
+        query_log.check(budget=2, what='loop')
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""EXPLAIN QUERY PLAN check for the queries behind the public pages and API
+
+Every SELECT issued while serving the hot routes is captured and explained;
+a full table scan is a failure unless the table is listed in FULL_SCAN_OK.
+"""
+
+import re
+
+import pytest
+from sqlalchemy import event, text
+
+HOT_ROUTES = ['/', '/week', '/month', '/announcements', '/api/v1/status', '/api/v1/open-now',
+              '/api/v1/schedule', '/calendar.ics']
+
+# Tables that are read whole by design (seven rows at most)
+FULL_SCAN_OK = {'standardhours'}
+
+
+@pytest.fixture
+def captured_selects(app):
+    from app.database import engine
+    
+    statements = []
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+    
+    event.listen(engine, 'before_cursor_execute', capture)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', capture)
+
+
+def _full_scans(plan_rows):
+    """Tables scanned without an index, from EXPLAIN QUERY PLAN rows"""
+    scans = set()
+    for row in plan_rows:
+        detail = row[-1]
+        match = re.match(r'SCAN (?:TABLE )?(\w+)', detail)
+        if match and 'USING' not in detail:
+            scans.add(match.group(1))
+    return scans
+
+
+def test_hot_queries_use_indexes(app, client, captured_selects, cold_caches):
+    from app.database import engine
+    from app.services import StatusService
+    from app.models import StatusType
+    
+    # A stored status, so the status lookups actually run
+    with app.app_context():
+        StatusService.update_status(StatusType.ANWESEND)
+    
+    for url in HOT_ROUTES:
+        cold_caches()
+        assert client.get(url).status_code == 200, url
+    
+    assert captured_selects
+    with engine.connect() as conn:
+        for statement, parameters in captured_selects:
+            plan = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+            scans = _full_scans(plan) - FULL_SCAN_OK
+            assert not scans, f'full scan of {scans}:\n{statement}'
+
+
+def test_status_fallback_and_announcements_use_indexes(app):
+    from app.database import engine
+    
+    queries = [
+        # Latest status without the Settings pointer
+        ('SELECT * FROM status ORDER BY created_at DESC, id DESC LIMIT 1', 'ix_status_created_at'),
+        ("SELECT * FROM announcement WHERE lang = 'de' AND active = 1 "
+         "ORDER BY created_at DESC, id DESC LIMIT 6",
+         'ix_announcement_lang_active_created_id'),
+        # Older pages: keyset cursor (created_at, id)
+        ("SELECT * FROM announcement WHERE lang = 'de' AND active = 1 AND created_at <= '2025-01-01' "
+         "AND (created_at < '2025-01-01' OR (created_at = '2025-01-01' AND id < 42)) "
+         "ORDER BY created_at DESC, id DESC LIMIT 21",
+         'ix_announcement_lang_active_created_id'),
+    ]
+    with engine.connect() as conn:
+        for statement, index in queries:
+            plan = ' '.join(row[-1] for row in conn.execute(text(f'EXPLAIN QUERY PLAN {statement}')))
+            assert index in plan, plan
+            assert 'TEMP B-TREE' not in plan, plan
\ No newline at end of file
@@ -0,0 +1,185 @@
+"""Open/closed state and the next opening, computed from the interval index"""
+
+from datetime import date, datetime, timedelta
+from itertools import count
+
+import pytest
+
+import app.services.schedule as schedule_module
+from app.services.schedule import ScheduleService
+
+TZ = ScheduleService.TIMEZONE
+
+# 2025-01-06 is a Monday
+MONDAY = date(2025, 1, 6)
+SUNDAY = MONDAY + timedelta(days=6)
+
+WEEKDAYS = {day: ['08:00-12:00', '13:00-17:00'] for day in range(5)}
+
+
+@pytest.fixture
+def schedule(monkeypatch):
+    """Callable setting the weekly template, exceptions and the current time"""
+    versions = count(1)
+    
+    def configure(now: datetime, weekly=WEEKDAYS, exceptions=None):
+        cache = {
+            'start': now.date() - timedelta(days=30),
+            'end': now.date() + timedelta(days=400),
+            'weekly': weekly,
+            'exceptions': {
+                day: {'closed': not ranges, 'time_ranges': ranges, 'note': None}
+                for day, ranges in (exceptions or {}).items()
+            }
+        }
+        
+        class FrozenDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return TZ.localize(now)
+        
+        monkeypatch.setattr(schedule_module, 'datetime', FrozenDatetime)
+        monkeypatch.setattr(ScheduleService, '_get_cache', staticmethod(lambda: cache))
+        # A fresh version per call, so no index survives from another test
+        version = next(versions)
+        monkeypatch.setattr(schedule_module.DataVersionService, 'get_version', staticmethod(lambda: version))
+        monkeypatch.setattr(ScheduleService, '_index', None)
+    return configure
+
+
+def _at(day: date, hour: int, minute: int = 0) -> datetime:
+    return datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=minute)
+
+
+def _next_open(day: date, time_range: str) -> dict:
+    return {'date': day, 'time': time_range.split('-')[0], 'time_range': time_range}
+
+
+@pytest.mark.parametrize('hour, minute, is_open', [
+    (7, 59, False),
+    (8, 0, True),
+    (12, 0, True),   # The end minute still counts as open
+    (12, 1, False),
+    (12, 59, False),
+    (13, 0, True),
+    (17, 0, True),
+    (17, 1, False),
+])
+def test_range_edges(schedule, hour, minute, is_open):
+    schedule(_at(MONDAY, hour, minute))
+    
+    assert ScheduleService.is_open_now() is is_open
+
+
+def test_state_bucket_ends_one_minute_after_closing(schedule):
+    schedule(_at(MONDAY, 11, 30))
+    
+    assert ScheduleService.get_state_bucket() == (True, TZ.localize(_at(MONDAY, 12, 1)))
+
+
+def test_state_bucket_ends_at_the_next_opening(schedule):
+    schedule(_at(MONDAY, 12, 30))
+    
+    assert ScheduleService.get_state_bucket() == (False, TZ.localize(_at(MONDAY, 13)))
+
+
+def test_overlapping_ranges_use_the_latest_end(schedule):
+    # The short range starts later but ends earlier than the long one
+    schedule(_at(MONDAY, 11, 30), weekly={0: ['08:00-12:00', '10:00-11:00']})
+    
+    assert ScheduleService.get_state_bucket() == (True, TZ.localize(_at(MONDAY, 12, 1)))
+
+
+def test_touching_ranges_stay_open(schedule):
+    schedule(_at(MONDAY, 12, 0), weekly={0: ['08:00-12:00', '12:00-14:00']})
+    
+    assert ScheduleService.get_state_bucket() == (True, TZ.localize(_at(MONDAY, 14, 1)))
+
+
+def test_next_open_rolls_over_midnight(schedule):
+    schedule(_at(MONDAY, 18))
+    
+    assert ScheduleService.is_open_now() is False
+    assert ScheduleService.get_next_open_time() == _next_open(MONDAY + timedelta(days=1), '08:00-12:00')
+    # The bucket still ends at midnight, when the displayed date changes
+    assert ScheduleService.get_state_bucket() == (False, TZ.localize(_at(MONDAY + timedelta(days=1), 0)))
+
+
+def test_changes_at_spans_the_week_end(schedule, client):
+    friday = MONDAY + timedelta(days=4)
+    schedule(_at(friday, 18), weekly={0: ['08:30-12:00'], 4: ['08:00-17:00']})
+    next_monday = MONDAY + timedelta(days=7)
+    
+    assert ScheduleService.get_state() == (False, TZ.localize(_at(next_monday, 8, 30)))
+    # Only the page-cache bucket stops at midnight
+    assert ScheduleService.get_state_bucket() == (False, TZ.localize(_at(friday + timedelta(days=1), 0)))
+    
+    body = client.get('/api/v1/open-now').get_json()
+    assert body['open'] is False
+    assert body['changes_at'] == TZ.localize(_at(next_monday, 8, 30)).isoformat()
+
+
+def test_open_across_midnight_closes_on_the_next_day(schedule):
+    schedule(_at(MONDAY, 23), weekly={0: ['20:00-23:59'], 1: ['00:00-02:00', '08:00-12:00']})
+    
+    assert ScheduleService.get_state() == (True, TZ.localize(_at(MONDAY + timedelta(days=1), 2, 1)))
+
+
+def test_next_open_rolls_over_the_week_end(schedule):
+    schedule(_at(SUNDAY - timedelta(days=1), 10))
+    
+    assert ScheduleService.is_open_now() is False
+    assert ScheduleService.get_next_open_time() == _next_open(SUNDAY + timedelta(days=1), '08:00-12:00')
+
+
+def test_next_open_later_the_same_day(schedule):
+    schedule(_at(MONDAY, 7))
+    
+    assert ScheduleService.get_next_open_time() == _next_open(MONDAY, '08:00-12:00')
+
+
+def test_closing_exception(schedule):
+    tuesday = MONDAY + timedelta(days=1)
+    schedule(_at(tuesday, 10), exceptions={tuesday: [], tuesday + timedelta(days=1): []})
+    
+    assert ScheduleService.is_open_now() is False
+    # Both closed days are skipped
+    assert ScheduleService.get_next_open_time() == _next_open(tuesday + timedelta(days=2), '08:00-12:00')
+
+
+def test_replacing_exception(schedule):
+    schedule(_at(MONDAY, 10), exceptions={MONDAY: ['14:00-16:00']})
+    
+    assert ScheduleService.is_open_now() is False
+    assert ScheduleService.get_next_open_time() == _next_open(MONDAY, '14:00-16:00')
+
+
+def test_exception_opens_a_closed_day(schedule):
+    schedule(_at(SUNDAY, 9), exceptions={SUNDAY: ['09:00-11:00']})
+    
+    assert ScheduleService.get_state_bucket() == (True, TZ.localize(_at(SUNDAY, 11, 1)))
+
+
+def test_nothing_opens_within_the_horizon(schedule, monkeypatch):
+    monkeypatch.setattr(ScheduleService, 'HORIZON_DAYS', 3)
+    # The next opening is on day four, one day past the horizon
+    schedule(_at(MONDAY, 10), exceptions={MONDAY: [], MONDAY + timedelta(days=1): [],
+                                          MONDAY + timedelta(days=2): []})
+    
+    assert ScheduleService.is_open_now() is False
+    assert ScheduleService.get_next_open_time() is None
+    assert ScheduleService.get_state_bucket() == (False, TZ.localize(_at(MONDAY + timedelta(days=1), 0)))
+
+
+def test_opening_on_the_last_horizon_day(schedule, monkeypatch):
+    monkeypatch.setattr(ScheduleService, 'HORIZON_DAYS', 3)
+    schedule(_at(MONDAY, 10), exceptions={MONDAY: [], MONDAY + timedelta(days=1): []})
+    
+    assert ScheduleService.get_next_open_time() == _next_open(MONDAY + timedelta(days=2), '08:00-12:00')
+
+
+def test_never_open(schedule):
+    schedule(_at(MONDAY, 10), weekly={})
+    
+    assert ScheduleService.is_open_now() is False
+    assert ScheduleService.get_next_open_time() is None
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""Only writers publish the snapshot; requests read it or fall back to the database"""
+
+from datetime import timedelta
+
+import pytest
+
+
+@pytest.fixture
+def publishes(app, monkeypatch):
+    """Calls of SnapshotService.publish, which still runs"""
+    from app.services import SnapshotService
+    
+    calls = []
+    publish = SnapshotService.publish
+    
+    def counting_publish():
+        calls.append(1)
+        return publish()
+    monkeypatch.setattr(SnapshotService, 'publish', counting_publish)
+    return calls
+
+
+def _stored_version():
+    from app.database import engine
+    from test_data_version import _stored_version
+    return _stored_version(engine)
+
+
+def test_a_write_publishes_the_new_version(app, publishes):
+    from app.models import StatusType
+    from app.services import SnapshotService, StatusService
+    
+    with app.app_context():
+        StatusService.update_status(StatusType.ANWESEND)
+    
+    assert len(publishes) == 1
+    assert SnapshotService._open()['data_version'] == _stored_version()
+
+
+def test_requests_never_publish(app, client, cold_caches, publishes, monkeypatch):
+    from app.models import StatusType
+    from app.services import SnapshotService, StatusService
+    
+    # A stale snapshot, as after a write that could not publish
+    monkeypatch.setattr(SnapshotService, 'publish', lambda: publishes.append(1) or False)
+    with app.app_context():
+        StatusService.update_status(StatusType.ANWESEND)
+    assert SnapshotService._open()['data_version'] != _stored_version()
+    
+    for url in ('/', '/week', '/month', '/api/v1/status', '/api/v1/open-now'):
+        cold_caches()
+        assert client.get(url).status_code == 200
+    assert len(publishes) == 1
+
+
+def test_a_snapshot_from_yesterday_still_serves_today(app, cold_caches):
+    from app.services import ScheduleService, SnapshotService
+    
+    assert SnapshotService.publish()
+    header = SnapshotService._open()
+    today = ScheduleService._get_cache()['today']
+    schedule = SnapshotService.get_schedule(header['data_version'], today + timedelta(days=1))
+    
+    assert schedule is not None
+    assert schedule['start'] == today - timedelta(days=ScheduleService.CACHE_PAST_DAYS)
+    # Outside its window the snapshot is not used at all
+    far = today + timedelta(days=ScheduleService.CACHE_FUTURE_DAYS + 1)
+    assert SnapshotService.get_schedule(header['data_version'], far) is None
\ No newline at end of file